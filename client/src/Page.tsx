@@ -9,6 +9,9 @@ import Elements from "./components/Elements";
 import LineChart from "./components/LineChart";
 import { useDebounce } from "./hook/useDebounce";
 
+// Largest page the server hands out (MAX_PAGE_SIZE)
+const PAGE_SIZE = 1000;
+
 const Page: React.FC = () => {
   const { dispatch, activeMonth, activeYear } = useData();
   interface AllData {
@@ -24,6 +27,7 @@ const Page: React.FC = () => {
     status: number;
     message: string;
     data: AllData[];
+    next_cursor?: string | null;
   }
 
   interface TableData {
@@ -124,13 +128,29 @@ const Page: React.FC = () => {
     amount: { minV: 0, maxV: 0 },
   });
 
+  // /all returns one page at a time; follow next_cursor until the last one
+  const allPages = async (query: string) => {
+    const rows: AllData[] = [];
+    let cursor: string | null | undefined = null;
+    do {
+      const page: AllResponse = await request<AllResponse>(
+        "GET",
+        `all?${query}&limit=${PAGE_SIZE}` +
+          (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "")
+      );
+      if (page.status !== 200) return null;
+      rows.push(...page.data);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return rows;
+  };
+
   const allDataApi = async () => {
-    const data = await request<AllResponse>(
-      "GET",
-      `all?monthNumber=${activeMonth + 1}&yearNumber=${activeYear}`
+    const data = await allPages(
+      `monthNumber=${activeMonth + 1}&yearNumber=${activeYear}`
     );
-    if (data.status === 200) {
-      const td = data.data.map((o) => ({
+    if (data) {
+      const td = data.map((o) => ({
         date: o.created_at,
         name: o.name,
         amount: o.amount,
@@ -251,9 +271,9 @@ const Page: React.FC = () => {
       `monthNumber=${(activeMonth + 1).toString()}&yearNumber=${activeYear}`
     );
     let query_str = query_arr.join("&");
-    const data = await request<AllResponse>("GET", `all?${query_str}`);
-    if (data.status === 200) {
-      const td = data.data.map((o) => ({
+    const data = await allPages(query_str);
+    if (data) {
+      const td = data.map((o) => ({
         date: o.created_at,
         name: o.name,
         amount: o.amount,
@@ -0,0 +1,323 @@
+import asyncio
+import heapq
+import itertools
+import time
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from ..models.archive import ExpenseArchive
+from ..models.expense import Expense
+from ..utils.archive import month_bounds, select_month
+from ..utils.pagination import STREAM_BATCH_SIZE
+from .config import get_settings
+from .database import open_session
+
+
+class ArchivedRow(dict):
+    """An archived expense that reads like a SQLAlchemy Row (row.amount,
+    row._mapping), so the routers' row helpers work on both."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def _mapping(self):
+        return self
+
+
+def sort_key(key: str):
+    return lambda row: (getattr(row, key), row.id)
+
+
+def table_rows(table, batch_size: int = STREAM_BATCH_SIZE):
+    """ArchivedRows from a pyarrow Table, converted batch_size at a time."""
+    for offset in range(0, table.num_rows, batch_size):
+        for row in table.slice(offset, batch_size).to_pylist():
+            yield ArchivedRow(row)
+
+
+async def merge_sorted(rows, archived, key, descending: bool = True):
+    """Interleaves an async stream of hot rows with an async stream of
+    archived ones, both sorted by key."""
+    waiting = await anext(archived, None)
+    async for row in rows:
+        while waiting is not None and (
+            key(waiting) > key(row) if descending else key(waiting) < key(row)
+        ):
+            yield waiting
+            waiting = await anext(archived, None)
+        yield row
+    if waiting is not None:
+        yield waiting
+    async for row in archived:
+        yield row
+
+
+class ArchiveCatalog:
+    """The expense_archive manifest, reloaded every ARCHIVE_MANIFEST_TTL.
+
+    Archived months are read from their Parquet files only, and expense is
+    queried from boundary on, so a month is never counted twice while its
+    rows wait to be purged.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.months = {}  # first day of month -> Parquet path
+        self.boundary = None
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def load(self):
+        if self._fresh():
+            return self
+        async with self._lock:
+            if not self._fresh():
+                # From the primary, like the category catalogue: a replica
+                # behind a purge would hide the purged month entirely
+                async with open_session() as db:
+                    result = await db.execute(
+                        select(ExpenseArchive.month, ExpenseArchive.path)
+                    )
+                    self.months = {row.month: row.path for row in result}
+                self.boundary = (
+                    month_bounds(max(self.months))[1] if self.months else None
+                )
+                self._loaded_at = time.monotonic()
+        return self
+
+    def hot_conditions(self) -> list:
+        return [Expense.created_at >= self.boundary] if self.boundary else []
+
+    def covers(self, start=None) -> bool:
+        """Whether a range starting at start reaches archived months."""
+        return self.boundary is not None and (start is None or start < self.boundary)
+
+    def _months(self, start=None, end=None, descending: bool = True) -> list:
+        """(start, end, path) of the archived months overlapping [start, end),
+        in created_at order."""
+        months = []
+        for month, path in sorted(self.months.items(), reverse=descending):
+            month_start, month_end = month_bounds(month)
+            if (end is None or month_start < end) and (
+                start is None or month_end > start
+            ):
+                months.append((month_start, month_end, path))
+        return months
+
+    @staticmethod
+    def _before_cursor(month_start, month_end, position, descending) -> bool:
+        # A month every row of which the created_at cursor has passed
+        if position is None:
+            return False
+        value = position[0]
+        return month_start > value if descending else month_end <= value
+
+    async def batches(
+        self,
+        user_id: int,
+        accept=None,
+        start=None,
+        end=None,
+        key: str = "created_at",
+        descending: bool = True,
+        position: tuple = None,
+        columns=None,
+    ):
+        """The user's archived rows in [start, end) that pass accept, in
+        (key, id) order, as lists of ArchivedRows.
+
+        In created_at order months hold disjoint ranges, so one month is read
+        per step. Other orders interleave months: each is read once, kept as
+        sorted Arrow columns and merged, STREAM_BATCH_SIZE rows at a time.
+        """
+        if not self.covers(start):
+            return
+        months = self._months(start, end, descending)
+        if key == "created_at":
+            for month_start, month_end, path in months:
+                if self._before_cursor(month_start, month_end, position, descending):
+                    continue
+                table, _, _ = await run_in_threadpool(
+                    select_month,
+                    path,
+                    user_id,
+                    accept,
+                    key,
+                    descending,
+                    position,
+                    None,
+                    columns,
+                )
+                for offset in range(0, table.num_rows, STREAM_BATCH_SIZE):
+                    batch = table.slice(offset, STREAM_BATCH_SIZE).to_pylist()
+                    yield [ArchivedRow(row) for row in batch]
+            return
+
+        tables = []
+        for _, _, path in months:
+            table, _, _ = await run_in_threadpool(
+                select_month,
+                path,
+                user_id,
+                accept,
+                key,
+                descending,
+                position,
+                None,
+                columns,
+            )
+            if table.num_rows:
+                tables.append(table)
+        merged = heapq.merge(
+            *(table_rows(table) for table in tables),
+            key=sort_key(key),
+            reverse=descending,
+        )
+        while batch := list(itertools.islice(merged, STREAM_BATCH_SIZE)):
+            yield batch
+
+    async def stream(self, *args, **kwargs):
+        """batches(), one row at a time."""
+        async for batch in self.batches(*args, **kwargs):
+            for row in batch:
+                yield row
+
+    async def amounts(self, user_id: int, start=None, end=None, accept=None) -> list:
+        """(created_at, category_id, amount) of the user's archived expenses
+        in [start, end) that pass accept, oldest first, for the analytics
+        endpoints."""
+
+        def in_range(created_at, category_id, amount) -> bool:
+            if start is not None and created_at < start:
+                return False
+            if end is not None and created_at >= end:
+                return False
+            return accept is None or accept(created_at, category_id, amount)
+
+        rows = []
+        async for batch in self.batches(
+            user_id,
+            in_range,
+            start,
+            end,
+            descending=False,
+            columns=("created_at", "category_id", "amount"),
+        ):
+            rows.extend((row.created_at, row.category_id, row.amount) for row in batch)
+        return rows
+
+    async def head(
+        self,
+        limit: int,
+        user_id: int,
+        accept=None,
+        start=None,
+        end=None,
+        key: str = "created_at",
+        descending: bool = True,
+        position: tuple = None,
+        columns=None,
+        totals: bool = False,
+    ):
+        """The first limit archived rows in (key, id) order after position.
+
+        Each month contributes at most limit rows, so memory stays at one
+        month plus one page. Returns (rows, matched, amount); with totals
+        every month in range is read and matched/amount count all the rows
+        accept took, otherwise months the page does not need are skipped.
+        """
+        rows, matched, amount = [], 0, 0
+        if not self.covers(start):
+            return rows, matched, amount
+        for month_start, month_end, path in self._months(start, end, descending):
+            if key == "created_at" and not totals:
+                if len(rows) >= limit:
+                    break
+                if self._before_cursor(month_start, month_end, position, descending):
+                    continue
+            table, count, spent = await run_in_threadpool(
+                select_month,
+                path,
+                user_id,
+                accept,
+                key,
+                descending,
+                position,
+                limit,
+                columns,
+            )
+            matched += count
+            amount += spent
+            merged = heapq.merge(
+                rows, table_rows(table), key=sort_key(key), reverse=descending
+            )
+            rows = list(itertools.islice(merged, limit))
+        return rows, matched, amount
+
+    async def page(
+        self,
+        rows: list,
+        limit: int,
+        user_id: int,
+        accept=None,
+        start=None,
+        end=None,
+        key: str = "created_at",
+        descending: bool = True,
+        position: tuple = None,
+        columns=None,
+    ) -> list:
+        """Completes a page of hot rows (limit + 1 of them, as fetched for
+        next_cursor) with archived rows where the order calls for them."""
+        if not self.covers(start):
+            return rows
+        # Archived rows are all older than hot ones
+        if key == "created_at" and descending and len(rows) > limit:
+            return rows
+        archived, _, _ = await self.head(
+            limit + 1, user_id, accept, start, end, key, descending, position, columns
+        )
+        merged = heapq.merge(rows, archived, key=sort_key(key), reverse=descending)
+        return list(itertools.islice(merged, limit + 1))
+
+    async def first_page(
+        self,
+        rows: list,
+        limit: int,
+        user_id: int,
+        accept=None,
+        start=None,
+        end=None,
+        key: str = "created_at",
+        descending: bool = True,
+        columns=None,
+    ):
+        """page() without a cursor that also counts the archived rows
+        accept takes, from the same read; returns (rows, matched, amount)."""
+        archived, matched, amount = await self.head(
+            limit + 1,
+            user_id,
+            accept,
+            start,
+            end,
+            key,
+            descending,
+            columns=columns,
+            totals=True,
+        )
+        merged = heapq.merge(rows, archived, key=sort_key(key), reverse=descending)
+        return list(itertools.islice(merged, limit + 1)), matched, amount
+
+
+archive_catalog = ArchiveCatalog(get_settings().archive_manifest_ttl)
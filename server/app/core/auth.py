@@ -0,0 +1,83 @@
+from fastapi import status
+from jose import JWTError
+from starlette.requests import HTTPConnection
+from ..utils.response import json_response
+from ..utils.token import decode_token
+from .sessions import revoked_sessions
+
+# Routes served without an access token; /refresh and /logout authenticate
+# with the refresh cookie themselves
+PUBLIC_PATHS = frozenset(
+    (
+        "/api/v1/login",
+        "/api/v1/register",
+        "/api/v1/refresh",
+        "/api/v1/logout",
+        "/metrics",
+        "/docs",
+        "/docs/oauth2-redirect",
+        "/redoc",
+        "/openapi.json",
+    )
+)
+# Internal routes check INTERNAL_API_TOKEN instead
+PUBLIC_PREFIXES = ("/internal/",)
+
+
+def unauthorized(code: str):
+    return json_response(
+        message=f"HTTP_401_UNAUTHORIZED {code}",
+        status_code=status.HTTP_401_UNAUTHORIZED,
+    )
+
+
+class AuthMiddleware:
+    """Verifies the accessToken cookie and stores its claims in
+    scope["state"]["user"], where handlers read them as request.state.user.
+
+    A plain ASGI middleware, so responses (including streams) pass through
+    untouched instead of being re-wrapped per request.
+    """
+
+    def __init__(
+        self,
+        app,
+        public_paths: frozenset = PUBLIC_PATHS,
+        public_prefixes: tuple = PUBLIC_PREFIXES,
+    ):
+        self.app = app
+        self.public_paths = public_paths
+        self.public_prefixes = public_prefixes
+
+    def is_public(self, scope) -> bool:
+        path = scope["path"]
+        return (
+            scope["method"] == "OPTIONS"
+            or path in self.public_paths
+            or path.startswith(self.public_prefixes)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.is_public(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = HTTPConnection(scope).cookies.get("accessToken")
+        if not token:
+            await unauthorized("__003")(scope, receive, send)
+            return
+
+        try:
+            payload = decode_token(token)
+        except JWTError:
+            await unauthorized("__004")(scope, receive, send)
+            return
+        if not payload:
+            await unauthorized("__007")(scope, receive, send)
+            return
+        if payload.get("sid") in revoked_sessions:
+            await unauthorized("__008")(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
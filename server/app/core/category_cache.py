@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import time
+from sqlalchemy import select
+from ..models.category import Category
+from ..schemas.category import AllCategoryData
+from ..utils.response import RowSerializer, dumps
+from .config import get_settings
+from .database import open_session
+from .store import shared_store
+
+VERSION_KEY = "category:version"
+
+category_serializer = RowSerializer(AllCategoryData)
+
+
+class CategorySnapshot:
+    def __init__(self, version: int, categories: list):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.names = {cat.id: cat.name for cat in categories}
+        self.income_ids = [cat.id for cat in categories if cat.name == "income"]
+        data = category_serializer.rows(categories)
+        self.body = dumps({"status": 200, "message": "Ok", "data": data})
+        self.etag = '"%s"' % hashlib.sha1(self.body).hexdigest()
+
+
+class CategoryCache:
+    """Category catalogue snapshot, reloaded when the shared version moves or
+    after ttl seconds.
+
+    Without a shared store each worker has its own version, so the ttl is
+    what brings in categories added on another worker; covering() reloads
+    at once for ids the snapshot does not know yet.
+    """
+
+    def __init__(self, store, ttl: float):
+        self.store = store
+        self.ttl = ttl
+        self.snapshot = None
+        self._lock = asyncio.Lock()
+
+    async def version(self):
+        return int(await self.store.get(VERSION_KEY) or 0)
+
+    def _current(self, version: int) -> bool:
+        return (
+            self.snapshot is not None
+            and self.snapshot.version == version
+            and time.monotonic() - self.snapshot.loaded_at < self.ttl
+        )
+
+    async def get(self) -> CategorySnapshot:
+        version = await self.version()
+        if self._current(version):
+            return self.snapshot
+
+        async with self._lock:
+            if not self._current(version):
+                self.snapshot = await self._load(version)
+        return self.snapshot
+
+    async def covering(self, snapshot: CategorySnapshot, category_ids):
+        """snapshot, or a reloaded one when it lacks any of category_ids."""
+        if all(category_id in snapshot.names for category_id in category_ids):
+            return snapshot
+
+        async with self._lock:
+            # Another request may have reloaded while this one waited
+            if self.snapshot is None or self.snapshot is snapshot:
+                self.snapshot = await self._load(await self.version())
+        return self.snapshot
+
+    async def _load(self, version: int) -> CategorySnapshot:
+        # Always from the primary: a lagging replica could return the old
+        # list, which would then be cached under the new version
+        async with open_session() as db:
+            result = await db.execute(
+                select(Category.id, Category.name).order_by(Category.id)
+            )
+            return CategorySnapshot(version, result.all())
+
+    async def invalidate(self):
+        await self.store.incr(VERSION_KEY)
+        self.snapshot = None
+
+
+category_cache = CategoryCache(shared_store, get_settings().category_cache_ttl)
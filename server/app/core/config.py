@@ -0,0 +1,138 @@
+from dotenv import load_dotenv
+from functools import lru_cache
+import os
+
+
+def _bool(value: str, default: bool) -> bool:
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def _list(value: str) -> list:
+    return [item.strip() for item in value.split(",")] if value else []
+
+
+class Settings:
+    """Every environment variable the app reads, parsed once.
+
+    Modules take their configuration from get_settings() instead of calling
+    os.getenv themselves; .env is loaded on the first call only.
+    """
+
+    def __init__(self, env=None):
+        env = os.environ if env is None else env
+
+        self.app_env = env.get("APP_ENV")
+        self.auto_migrate = _bool(env.get("AUTO_MIGRATE"), False)
+        self.cors_origins = _list(env.get("CORS_ORIGIN"))
+        self.cors_methods = _list(env.get("CORS_METHODS"))
+        self.cors_headers = _list(env.get("CORS_HEADERS"))
+        self.internal_api_token = env.get("INTERNAL_API_TOKEN")
+
+        # Database
+        self.db_type = env.get("DB_TYPE")
+        self.db_async_type = env.get("DB_ASYNC_TYPE", "mysql+aiomysql")
+        self.db_user = env.get("DB_USER")
+        self.db_pass = env.get("DB_PASS")
+        self.db_host = env.get("DB_HOST")
+        self.db_port = env.get("DB_PORT")
+        self.db_name = env.get("DB_NAME")
+        # Full URLs override the DB_* parts, e.g. sqlite:///bench.db
+        self.database_url_override = env.get("DATABASE_URL")
+        self.async_database_url_override = env.get("ASYNC_DATABASE_URL")
+        self.db_async = _bool(env.get("DB_ASYNC"), True)
+        self.db_pool_size = int(env.get("DB_POOL_SIZE", "10"))
+        self.db_max_overflow = int(env.get("DB_MAX_OVERFLOW", "20"))
+        self.db_pool_timeout = float(env.get("DB_POOL_TIMEOUT", "10"))
+        self.db_pool_recycle = int(env.get("DB_POOL_RECYCLE", "1800"))
+        self.db_pool_pre_ping = _bool(env.get("DB_POOL_PRE_PING"), True)
+        self.db_statement_timeout_ms = int(env.get("DB_STATEMENT_TIMEOUT_MS", "0"))
+        self.slow_query_ms = float(env.get("SLOW_QUERY_MS", "200"))
+        # Read replicas: host or host:port, same credentials and database name
+        self.db_replica_hosts = _list(env.get("DB_REPLICA_HOSTS"))
+        self.replica_retry_seconds = float(env.get("REPLICA_RETRY_SECONDS", "30"))
+        self.read_your_writes_seconds = float(env.get("READ_YOUR_WRITES_SECONDS", "5"))
+
+        # Tokens and passwords
+        self.access_secret_key = env.get("ACCESS_SECRET_KEY")
+        self.refresh_secret_key = env.get("REFRESH_SECRET_KEY")
+        self.algorithm = env.get("ALGORITHM", "HS256")
+        self.access_token_expire_minutes = int(
+            env.get("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+        )
+        self.refresh_token_expire_days = int(env.get("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+        self.token_cache_size = int(env.get("TOKEN_CACHE_SIZE", "10000"))
+        self.revocation_sync_seconds = float(env.get("REVOCATION_SYNC_SECONDS", "5"))
+        self.session_purge_seconds = float(env.get("SESSION_PURGE_SECONDS", "3600"))
+        self.refresh_reuse_grace_seconds = float(
+            env.get("REFRESH_REUSE_GRACE_SECONDS", "30")
+        )
+        self.argon2_time_cost = int(env.get("ARGON2_TIME_COST", "3"))
+        self.argon2_memory_cost = int(env.get("ARGON2_MEMORY_COST", "65536"))
+        self.argon2_parallelism = int(env.get("ARGON2_PARALLELISM", "4"))
+        self.password_workers = int(env.get("PASSWORD_WORKERS", "2"))
+        self.password_max_pending = int(env.get("PASSWORD_MAX_PENDING", "32"))
+
+        # Caches and shared state
+        self.shared_store_url = env.get("SHARED_STORE_URL")
+        self.search_index_users = int(env.get("SEARCH_INDEX_USERS", "64"))
+        self.response_cache_size = int(env.get("RESPONSE_CACHE_SIZE", "2048"))
+        # Without a shared store a write only bumps the versions of the worker
+        # that took it, so the other workers keep their copies briefly
+        shared_ttl = "300" if self.shared_store_url else "5"
+        self.response_cache_ttl = float(env.get("RESPONSE_CACHE_TTL", shared_ttl))
+        self.category_cache_ttl = float(env.get("CATEGORY_CACHE_TTL", shared_ttl))
+        self.response_cache_shared = _bool(env.get("RESPONSE_CACHE_SHARED"), False)
+
+        # Admission control
+        self.rate_limit_backend = env.get("RATE_LIMIT_BACKEND", "local")
+        self.rate_limit_max_keys = int(env.get("RATE_LIMIT_MAX_KEYS", "100000"))
+        self.rate_limit_login = env.get("RATE_LIMIT_LOGIN", "10/minute")
+        self.rate_limit_register = env.get("RATE_LIMIT_REGISTER", "5/minute")
+        self.rate_limit_write_ip = env.get("RATE_LIMIT_WRITE_IP", "300/minute")
+        self.rate_limit_write_user = env.get("RATE_LIMIT_WRITE_USER", "60/minute")
+        self.rate_limit_bulk_user = env.get("RATE_LIMIT_BULK_USER", "10/minute")
+        self.max_in_flight = int(env.get("MAX_IN_FLIGHT", "256"))
+
+        # Cold storage for old expense months
+        self.archive_dir = env.get("ARCHIVE_DIR", "archive")
+        self.archive_after_months = int(env.get("ARCHIVE_AFTER_MONTHS", "24"))
+        self.archive_purge_delay_seconds = float(
+            env.get("ARCHIVE_PURGE_DELAY_SECONDS", "600")
+        )
+        self.archive_manifest_ttl = float(env.get("ARCHIVE_MANIFEST_TTL", "60"))
+
+        # Write batching
+        self.group_commit = _bool(env.get("GROUP_COMMIT"), False)
+        self.group_commit_max_delay_ms = float(
+            env.get("GROUP_COMMIT_MAX_DELAY_MS", "5")
+        )
+        self.group_commit_max_batch = int(env.get("GROUP_COMMIT_MAX_BATCH", "500"))
+
+    def _url(self, driver: str, host: str = None) -> str:
+        if host is None:
+            host = f"{self.db_host}:{self.db_port}"
+        elif ":" not in host:
+            host = f"{host}:{self.db_port}"
+        return f"{driver}://{self.db_user}:{self.db_pass}@{host}/{self.db_name}"
+
+    @property
+    def database_url(self) -> str:
+        return self.database_url_override or self._url(self.db_type)
+
+    @property
+    def async_database_url(self) -> str:
+        return self.async_database_url_override or self._url(self.db_async_type)
+
+    def replica_url(self, host: str) -> str:
+        return self._url(self.db_type, host)
+
+    def async_replica_url(self, host: str) -> str:
+        return self._url(self.db_async_type, host)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    load_dotenv()
+    return Settings()
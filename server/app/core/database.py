@@ -1,32 +1,140 @@
-from dotenv import load_dotenv
-import os
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+from .config import get_settings
+from .pool import pool_options, apply_statement_timeout, apply_utc_session
+from .instrumentation import instrument_engine
 
-# Load env variable
-load_dotenv()
+settings = get_settings()
+DB_ASYNC = settings.db_async
 
-DB_USER = os.getenv("DB_USER")
-DB_PASS = os.getenv("DB_PASS")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
-DB_TYPE = os.getenv("DB_TYPE")
 
-SQLALCHEMY_DATABASE_URL = (
-    f"{DB_TYPE}://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
+def create_engines(url: str, async_url: str):
+    """The sync engine, plus the async one when DB_ASYNC is on, with the
+    pool, statement timeout, UTC session and query instrumentation applied."""
+    sync_engine = create_engine(url, **pool_options())
+    apply_statement_timeout(sync_engine)
+    apply_utc_session(sync_engine)
+    instrument_engine(sync_engine)
+
+    if not DB_ASYNC:
+        return sync_engine, None
+    async_engine = create_async_engine(async_url, **pool_options(is_async=True))
+    apply_statement_timeout(async_engine.sync_engine)
+    apply_utc_session(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    return sync_engine, async_engine
+
+
+def create_sessionmakers(sync_engine, async_engine):
+    sync_factory = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    async_factory = (
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        if async_engine is not None
+        else None
+    )
+    return sync_factory, async_factory
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The sync engine always exists: migrations and manage.py commands use it,
+# and with DB_ASYNC=false it also serves the API through the threadpool.
+# Engines connect lazily, so importing this module never touches the database
+engine, async_engine = create_engines(
+    settings.database_url, settings.async_database_url
+)
+session_local, async_session_local = create_sessionmakers(engine, async_engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = session_local()
+class ThreadedResult:
+    """Async iteration over a sync streaming result, one partition per thread hop."""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size=None):
+        partitions = self._result.partitions(size)
+        while True:
+            rows = await run_in_threadpool(next, partitions, None)
+            if rows is None:
+                break
+            yield rows
+
+    async def __aiter__(self):
+        async for rows in self.partitions():
+            for row in rows:
+                yield row
+
+
+class ThreadedSession:
+    """Sync Session exposed through the subset of the AsyncSession API the
+    routers use, so handlers are written once for both DB_ASYNC modes."""
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.execute, statement, params)
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def stream(self, statement, params=None):
+        result = await run_in_threadpool(self.sync_session.execute, statement, params)
+        return ThreadedResult(result)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+@asynccontextmanager
+async def open_session(sync_factory=session_local, async_factory=async_session_local):
+    if DB_ASYNC:
+        async with async_factory() as db:
+            yield db
+        return
+
+    db = ThreadedSession(sync_factory())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db():
+    async with open_session() as db:
+        yield db
+
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    await run_in_threadpool(engine.dispose)
@@ -0,0 +1,115 @@
+import asyncio
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.expense import Expense
+from ..utils import rollup
+from .config import get_settings
+from .database import open_session
+
+settings = get_settings()
+
+
+def write_expenses(db: Session, rows: list):
+    # executemany: drivers send it as one multi-row INSERT where they can
+    db.execute(insert(Expense), rows)
+    totals = {}
+    for row in rows:
+        key = (row["user_id"], row["category_id"], row["created_at"].date())
+        totals[key] = totals.get(key, 0) + row["amount"]
+    for (user_id, category_id, day), amount in totals.items():
+        rollup.apply_expense(db, user_id, category_id, amount, day)
+
+
+class GroupCommitWriter:
+    """Coalesces expense inserts from concurrent requests into one INSERT and
+    one commit.
+
+    The first row of a batch waits at most max_delay seconds; a full batch
+    is written at once. Batches are written one at a time, so rows that
+    arrive during a commit become the next batch. When a batch fails, its
+    rows are retried one by one so every caller gets its own result.
+    """
+
+    def __init__(self, max_delay: float, max_batch: int):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        self._flushing = None
+
+    async def submit(self, row: dict):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if self._flushing is None:
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.max_delay, self._flush
+                )
+        await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flushing is None and self._pending:
+            self._flushing = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self._pending:
+                batch = self._pending[: self.max_batch]
+                self._pending = self._pending[self.max_batch :]
+                await self._write(batch)
+        finally:
+            self._flushing = None
+
+    @staticmethod
+    async def _commit(rows: list):
+        async with open_session() as db:
+            await db.run_sync(write_expenses, rows)
+            await db.commit()
+
+    async def _write(self, batch: list):
+        try:
+            await self._commit([row for row, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                _resolve(batch[0][1], exc)
+                return
+            for row, future in batch:
+                try:
+                    await self._commit([row])
+                except Exception as row_exc:
+                    _resolve(future, row_exc)
+                else:
+                    _resolve(future)
+        else:
+            for _, future in batch:
+                _resolve(future)
+
+    async def drain(self):
+        # Writes whatever is still queued; called on shutdown
+        self._flush()
+        if self._flushing is not None:
+            await self._flushing
+
+
+def _resolve(future, exc: Exception = None):
+    # The request may have been cancelled while its row was being written
+    if future.done():
+        return
+    if exc is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exc)
+
+
+group_commit_writer = (
+    GroupCommitWriter(
+        settings.group_commit_max_delay_ms / 1000, settings.group_commit_max_batch
+    )
+    if settings.group_commit
+    else None
+)
@@ -0,0 +1,268 @@
+from contextvars import ContextVar
+import logging
+import threading
+import time
+from sqlalchemy import event
+from ..utils.metrics import Counter, Histogram
+from .config import get_settings
+
+SLOW_QUERY_MS = get_settings().slow_query_ms
+
+logger = logging.getLogger("budget_tracker.slow_query")
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+current_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+class LabeledHistograms:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def get(self, *labels) -> Histogram:
+        histogram = self.series.get(labels)
+        if histogram is None:
+            with self._lock:
+                histogram = self.series.setdefault(labels, Histogram())
+        return histogram
+
+
+class LabeledCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def get(self, *labels) -> Counter:
+        counter = self.series.get(labels)
+        if counter is None:
+            with self._lock:
+                counter = self.series.setdefault(labels, Counter())
+        return counter
+
+
+request_latency = LabeledHistograms()
+request_db_seconds = LabeledHistograms()
+request_serialize_seconds = LabeledHistograms()
+requests_total = LabeledCounters()
+db_query_seconds = Histogram()
+db_queries_total = Counter()
+slow_queries_total = Counter()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_seconds.observe(elapsed)
+    db_queries_total.inc()
+
+    stats = current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_queries_total.inc()
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def instrument_engine(sync_engine):
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_serialization(elapsed: float):
+    stats = current_stats.get()
+    if stats is not None:
+        stats.serialize_seconds += elapsed
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # The template with the router prefix, e.g. /api/v1/analytics/report
+    return route.path_format
+
+
+class MetricsMiddleware:
+    """Per-route latency, DB time and serialization time for HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = (time.perf_counter() - start) * 1000
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (
+                        b"server-timing",
+                        (
+                            f"db;dur={stats.db_seconds * 1000:.2f}, "
+                            f"serialize;dur={stats.serialize_seconds * 1000:.2f}, "
+                            f"app;dur={elapsed:.2f}"
+                        ).encode(),
+                    )
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            path = _route_label(scope)
+            method = scope["method"]
+
+            request_latency.get(method, path).observe(time.perf_counter() - start)
+            request_db_seconds.get(method, path).observe(stats.db_seconds)
+            request_serialize_seconds.get(method, path).observe(stats.serialize_seconds)
+            requests_total.get(method, path, str(status_code)).inc()
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+def _render_histogram(lines, name, help_text, series, label_names=()):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in series:
+        snapshot = histogram.snapshot()
+        base = _labels(label_names, labels)
+        prefix = base + "," if base else ""
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+        suffix = "{" + base + "}" if base else ""
+        lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+        lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+
+def _render_value(lines, name, help_text, kind, series, label_names=()):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in series:
+        base = _labels(label_names, labels)
+        suffix = "{" + base + "}" if base else ""
+        lines.append(f"{name}{suffix} {value}")
+
+
+def render_metrics(pools: dict, limits: dict = None) -> str:
+    route_labels = ("method", "route")
+    lines = []
+
+    _render_histogram(
+        lines,
+        "http_request_duration_seconds",
+        "Request latency by route.",
+        sorted(request_latency.series.items()),
+        route_labels,
+    )
+    _render_histogram(
+        lines,
+        "http_request_db_seconds",
+        "Time spent in SQL per request.",
+        sorted(request_db_seconds.series.items()),
+        route_labels,
+    )
+    _render_histogram(
+        lines,
+        "http_request_serialize_seconds",
+        "Time spent encoding response bodies per request.",
+        sorted(request_serialize_seconds.series.items()),
+        route_labels,
+    )
+    _render_value(
+        lines,
+        "http_requests_total",
+        "Requests by route and status code.",
+        "counter",
+        sorted((labels, c.value) for labels, c in requests_total.series.items()),
+        route_labels + ("status",),
+    )
+    _render_histogram(
+        lines,
+        "db_query_duration_seconds",
+        "SQL statement latency.",
+        [((), db_query_seconds)],
+    )
+    _render_value(
+        lines,
+        "db_queries_total",
+        "SQL statements executed.",
+        "counter",
+        [((), db_queries_total.value)],
+    )
+    _render_value(
+        lines,
+        "db_slow_queries_total",
+        f"SQL statements slower than {SLOW_QUERY_MS:g} ms.",
+        "counter",
+        [((), slow_queries_total.value)],
+    )
+
+    for field, kind in (
+        ("checked_out", "gauge"),
+        ("overflow", "gauge"),
+        ("checkouts", "counter"),
+        ("timeouts", "counter"),
+        ("wait_seconds", "counter"),
+    ):
+        _render_value(
+            lines,
+            f"db_pool_{field}",
+            f"Connection pool {field.replace('_', ' ')}.",
+            kind,
+            [((engine,), stats[field]) for engine, stats in pools.items()],
+            ("engine",),
+        )
+
+    if limits is not None:
+        _render_value(
+            lines,
+            "http_in_flight_requests",
+            "Requests currently being served.",
+            "gauge",
+            [((), limits["in_flight"])],
+        )
+        _render_value(
+            lines,
+            "http_shed_requests_total",
+            "Requests rejected by the concurrency limiter.",
+            "counter",
+            [((), limits["shed"])],
+        )
+        for outcome in ("allowed", "limited"):
+            _render_value(
+                lines,
+                f"rate_limit_{outcome}_total",
+                f"Requests {outcome} by rate limit rule.",
+                "counter",
+                sorted(((rule,), value) for rule, value in limits[outcome].items()),
+                ("rule",),
+            )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,13 @@
+import os
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "alembic.ini"
+)
+
+
+def run_migrations(revision: str = "head"):
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
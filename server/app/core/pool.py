@@ -0,0 +1,95 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from ..utils.metrics import Counter, Histogram
+from .config import get_settings
+
+settings = get_settings()
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkout_latency = Histogram()
+        self.checkouts = Counter()
+        self.timeouts = Counter()
+        self.wait_seconds = Counter()
+
+
+class TimedPoolMixin:
+    """Times how long callers wait in _do_get for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.checkout_latency.observe(elapsed)
+            self.metrics.checkouts.inc()
+            self.metrics.wait_seconds.inc(elapsed)
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.metrics.checkouts.value,
+            "timeouts": self.metrics.timeouts.value,
+            "wait_seconds": self.metrics.wait_seconds.value,
+            "checkout_latency": self.metrics.checkout_latency.snapshot(),
+        }
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(is_async: bool = False):
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def apply_statement_timeout(sync_engine):
+    if not settings.db_statement_timeout_ms or sync_engine.dialect.name != "mysql":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(
+            "SET SESSION max_execution_time = %s" % settings.db_statement_timeout_ms
+        )
+        cursor.close()
+
+
+def apply_utc_session(sync_engine):
+    """Runs MySQL sessions in UTC, so NOW() server defaults agree with the
+    naive UTC timestamps the app writes and CONVERT_TZ(created_at, '+00:00',
+    tz) is correct."""
+    if sync_engine.dialect.name != "mysql":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_time_zone(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET time_zone = '+00:00'")
+        cursor.close()
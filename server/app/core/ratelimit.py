@@ -0,0 +1,203 @@
+from collections import OrderedDict
+import math
+import threading
+import time
+from fastapi import status
+from ..utils.metrics import Counter
+from ..utils.response import json_response
+from .config import get_settings
+from .store import shared_store
+
+settings = get_settings()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+class RateLimit:
+    """A limit such as "10/minute"; the whole count may be spent in a burst."""
+
+    def __init__(self, spec: str):
+        count, period = spec.split("/")
+        self.spec = spec
+        self.burst = int(count)
+        self.period = PERIODS[period]
+        self.rate = self.burst / self.period
+
+
+# (method, path) -> [(bucket key, limit)]; "ip" buckets use the client
+# address, "user" buckets the access token's subject
+RATE_LIMITS = {
+    ("POST", "/api/v1/login"): [
+        ("ip", RateLimit(settings.rate_limit_login)),
+    ],
+    ("POST", "/api/v1/register"): [
+        ("ip", RateLimit(settings.rate_limit_register)),
+    ],
+    ("POST", "/api/v1/add_expense"): [
+        ("ip", RateLimit(settings.rate_limit_write_ip)),
+        ("user", RateLimit(settings.rate_limit_write_user)),
+    ],
+    ("POST", "/api/v1/add_expense/bulk"): [
+        ("user", RateLimit(settings.rate_limit_bulk_user)),
+    ],
+}
+
+# Monitoring and internal routes are never shed
+UNLIMITED_PREFIXES = ("/internal/", "/metrics")
+
+
+class LocalBuckets:
+    """In-process token buckets, least recently used keys evicted first."""
+
+    def __init__(self, max_keys: int):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.max_keys = max_keys
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        # Seconds until a token is available; 0 means the request may proceed
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedBuckets:
+    """Fixed windows of limit.period in the shared store.
+
+    The store only offers atomic increments, so each bucket is a counter per
+    window rather than a true token bucket; every worker sees the same counts.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = time.time()
+        window = int(now // limit.period)
+        count = await self.store.incr(f"ratelimit:{key}:{window}", ttl=limit.period + 1)
+        if count <= limit.burst:
+            return 0.0
+        return (window + 1) * limit.period - now
+
+
+def create_buckets(backend: str = None):
+    if (backend or settings.rate_limit_backend) == "shared":
+        return SharedBuckets(shared_store)
+    return LocalBuckets(settings.rate_limit_max_keys)
+
+
+class LimiterStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.allowed = {}
+        self.limited = {}
+        self.shed = Counter()
+        self.in_flight = 0
+
+    def count(self, table: dict, rule: str):
+        counter = table.get(rule)
+        if counter is None:
+            with self._lock:
+                counter = table.setdefault(rule, Counter())
+        counter.inc()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": settings.max_in_flight,
+            "shed": self.shed.value,
+            "allowed": {rule: c.value for rule, c in self.allowed.items()},
+            "limited": {rule: c.value for rule, c in self.limited.items()},
+        }
+
+
+limiter_stats = LimiterStats()
+
+
+def too_many_requests(wait: float):
+    return json_response(
+        message="Too many requests, please try again later",
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+class RateLimitMiddleware:
+    """Per-route token buckets keyed by client IP and/or user.
+
+    Sits inside AuthMiddleware so the user claims are already in
+    scope["state"].
+    """
+
+    def __init__(self, app, buckets=None):
+        self.app = app
+        self.buckets = buckets or create_buckets()
+
+    def _identity(self, scope, kind: str):
+        if kind == "ip":
+            client = scope.get("client")
+            return client[0] if client else None
+        user = scope.get("state", {}).get("user")
+        return user.get("sub") if user else None
+
+    async def __call__(self, scope, receive, send):
+        rules = None
+        if scope["type"] == "http":
+            rules = RATE_LIMITS.get((scope["method"], scope["path"]))
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        for kind, limit in rules:
+            identity = self._identity(scope, kind)
+            if identity is None:
+                continue
+            rule = f"{scope['method']} {scope['path']} {kind}"
+            wait = await self.buckets.take(f"{rule}:{identity}", limit)
+            if wait > 0:
+                limiter_stats.count(limiter_stats.limited, rule)
+                await too_many_requests(wait)(scope, receive, send)
+                return
+            limiter_stats.count(limiter_stats.allowed, rule)
+
+        await self.app(scope, receive, send)
+
+
+class ConcurrencyLimitMiddleware:
+    """Answers 503 once MAX_IN_FLIGHT requests are already being served, so
+    overload is shed before it queues up on the threadpool and DB pool."""
+
+    def __init__(self, app, max_in_flight: int = None):
+        self.app = app
+        self.max_in_flight = max_in_flight or settings.max_in_flight
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNLIMITED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if limiter_stats.in_flight >= self.max_in_flight:
+            limiter_stats.shed.inc()
+            response = json_response(
+                message="Server busy, please try again",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        limiter_stats.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter_stats.in_flight -= 1
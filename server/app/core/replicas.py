@@ -0,0 +1,106 @@
+import itertools
+import time
+from fastapi import Request
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from .config import get_settings
+from .database import create_engines, create_sessionmakers, open_session
+from .store import shared_store
+
+settings = get_settings()
+
+
+class Replica:
+    def __init__(self, host: str):
+        self.host = host
+        self.engine, self.async_engine = create_engines(
+            settings.replica_url(host), settings.async_replica_url(host)
+        )
+        self.session_local, self.async_session_local = create_sessionmakers(
+            self.engine, self.async_engine
+        )
+        self.down_until = 0.0
+
+    def open_session(self):
+        return open_session(self.session_local, self.async_session_local)
+
+    def pools(self) -> dict:
+        pools = {"sync": self.engine.pool.stats()}
+        if self.async_engine is not None:
+            pools["async"] = self.async_engine.pool.stats()
+        return pools
+
+    async def dispose(self):
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        await run_in_threadpool(self.engine.dispose)
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that are not marked down.
+
+    A replica that fails to hand out a connection is skipped for
+    retry_seconds; with none available, reads go to the primary.
+    """
+
+    def __init__(self, hosts: list, retry_seconds: float):
+        self.replicas = [Replica(host) for host in hosts]
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+
+    def candidates(self) -> list:
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        start = next(self._next) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    def mark_down(self, replica: Replica):
+        replica.down_until = time.monotonic() + self.retry_seconds
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
+
+
+replica_set = ReplicaSet(settings.db_replica_hosts, settings.replica_retry_seconds)
+
+
+def _wrote_key(user_id) -> str:
+    return f"user:{user_id}:wrote"
+
+
+async def note_write(user_id: int):
+    # Replicas may lag, so the writer's own reads stay on the primary for a bit
+    if replica_set.replicas:
+        await shared_store.set(
+            _wrote_key(user_id), b"1", ttl=settings.read_your_writes_seconds
+        )
+
+
+async def get_read_db(request: Request):
+    """get_db for read-only endpoints: a replica session when one is healthy
+    and the user has not written recently, otherwise the primary."""
+    user = request.scope.get("state", {}).get("user")
+    recently_wrote = (
+        user is not None
+        and replica_set.replicas
+        and await shared_store.get(_wrote_key(user["sub"])) is not None
+    )
+
+    if not recently_wrote:
+        for replica in replica_set.candidates():
+            async with replica.open_session() as db:
+                try:
+                    # Checking out a connection up front lets a dead replica
+                    # fall through to the next one before the handler runs
+                    await db.connection()
+                except SQLAlchemyError:
+                    replica_set.mark_down(replica)
+                    continue
+                yield db
+                return
+
+    async with open_session() as db:
+        yield db
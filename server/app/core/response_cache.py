@@ -0,0 +1,142 @@
+from email.utils import formatdate, parsedate_to_datetime
+import functools
+import hashlib
+import time
+from fastapi import Request, Response, status
+from ..utils.cache import TTLCache
+from .category_cache import category_cache
+from .config import get_settings
+from .store import shared_store
+
+settings = get_settings()
+
+
+class CachedResponse:
+    __slots__ = ("body", "media_type", "etag", "last_modified")
+
+    def __init__(self, body: bytes, media_type: str, last_modified: float):
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        self.last_modified = last_modified
+
+    def dump(self) -> bytes:
+        return b"%s\n%r\n" % (self.media_type.encode(), self.last_modified) + self.body
+
+    @classmethod
+    def load(cls, raw: bytes):
+        media_type, last_modified, body = raw.split(b"\n", 2)
+        return cls(body, media_type.decode(), float(last_modified))
+
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "private, no-cache",
+        }
+
+    def not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return self.etag in (tag.strip() for tag in if_none_match.split(","))
+
+        if_modified_since = request.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= since
+        return False
+
+    def response(self, request: Request) -> Response:
+        if self.not_modified(request):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers()
+            )
+        return Response(
+            content=self.body, media_type=self.media_type, headers=self.headers()
+        )
+
+
+class ResponseCache:
+    """Serialized responses keyed by user, data version, path and query.
+
+    Every write for a user bumps the user's version in the shared store, so
+    older entries are never looked up again and age out of the LRU. With
+    RESPONSE_CACHE_SHARED the bytes are also kept in the shared store, so
+    other workers can serve them.
+    """
+
+    def __init__(self, store, maxsize: int, ttl: float, shared: bool):
+        self.store = store
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.shared = shared
+
+    @staticmethod
+    def version_key(user_id: int) -> str:
+        return f"user:{user_id}:version"
+
+    async def version(self, user_id: int) -> int:
+        return int(await self.store.get(self.version_key(user_id)) or 0)
+
+    async def key(self, request: Request, user_id: int) -> str:
+        version = await self.version(user_id)
+        # Responses carry category names, so catalogue changes invalidate too
+        categories = await category_cache.version()
+        query = "&".join(sorted(request.url.query.split("&")))
+        return f"response:{user_id}:{version}:{categories}:{request.url.path}?{query}"
+
+    async def get(self, key: str):
+        entry = self.local.get(key)
+        if entry is None and self.shared:
+            raw = await self.store.get(key)
+            if raw is not None:
+                entry = CachedResponse.load(raw)
+                self.local.set(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse):
+        self.local.set(key, entry)
+        if self.shared:
+            await self.store.set(key, entry.dump(), ttl=self.ttl)
+
+    async def bump(self, user_id: int) -> int:
+        return await self.store.incr(self.version_key(user_id))
+
+
+response_cache = ResponseCache(
+    shared_store,
+    settings.response_cache_size,
+    settings.response_cache_ttl,
+    settings.response_cache_shared,
+)
+
+
+def cached_response(endpoint):
+    """Serve a user-scoped GET endpoint from response_cache.
+
+    Only plain 200 responses are stored; streaming and error responses pass
+    through untouched.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request = kwargs["request"]
+        user_id = int(request.state.user["sub"])
+        key = await response_cache.key(request, user_id)
+
+        entry = await response_cache.get(key)
+        if entry is not None:
+            return entry.response(request)
+
+        response = await endpoint(*args, **kwargs)
+        if response.status_code != status.HTTP_200_OK or not hasattr(response, "body"):
+            return response
+
+        entry = CachedResponse(response.body, response.media_type, time.time())
+        await response_cache.set(key, entry)
+        return entry.response(request)
+
+    return wrapper
@@ -0,0 +1,208 @@
+from collections import Counter, OrderedDict
+import asyncio
+import bisect
+import heapq
+import math
+import re
+from sqlalchemy import func, select
+from ..models.expense import Expense
+from .config import get_settings
+from .response_cache import response_cache
+
+SEARCH_LOAD_BATCH = 5000
+MAX_QUERY_TERMS = 8
+MAX_PREFIX_EXPANSION = 50
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN = re.compile(r"\w+")
+ARCHIVED_COLUMNS = ("id", "description", "created_at", "category_id", "amount")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+class UserIndex:
+    """Inverted index over one user's expense descriptions."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.clear()
+
+    def clear(self):
+        self.postings = {}  # token -> {expense id: term frequency}
+        self.vocabulary = []  # sorted tokens, for prefix lookups
+        self.docs = {}  # expense id -> (created_at, category_id, amount, length)
+        self.total_length = 0
+        self.loaded_id = 0
+        self.version = None  # response_cache data version the index matches
+        self.archived = {}  # expense id -> row, for rows only in the archive
+        self.boundary = None  # archive boundary the archived rows match
+
+    def add(self, id: int, description: str, created_at, category_id, amount):
+        if id in self.docs:
+            return
+        tokens = tokenize(description)
+        for token, frequency in Counter(tokens).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            posting[id] = frequency
+        self.docs[id] = (created_at, category_id, amount, len(tokens))
+        self.total_length += len(tokens)
+
+    def expand(self, prefix: str) -> list:
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        tokens = []
+        for token in self.vocabulary[start : start + MAX_PREFIX_EXPANSION]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def search(self, terms: list, accept, limit: int) -> list:
+        """BM25-ranked (score, id) pairs of documents matching every term as
+        a prefix, best first; ties go to the newer expense."""
+        if not self.docs:
+            return []
+        count = len(self.docs)
+        average_length = self.total_length / count or 1
+        scores = None
+
+        for term in terms:
+            term_scores = {}
+            for token in self.expand(term):
+                posting = self.postings[token]
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for id, frequency in posting.items():
+                    length = self.docs[id][3]
+                    score = (
+                        idf
+                        * frequency
+                        * (BM25_K1 + 1)
+                        / (
+                            frequency
+                            + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                        )
+                    )
+                    # A term counts once, through its best matching token
+                    if score > term_scores.get(id, 0):
+                        term_scores[id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    id: scores[id] + score
+                    for id, score in term_scores.items()
+                    if id in scores
+                }
+            if not scores:
+                return []
+
+        candidates = (
+            (score, id) for id, score in scores.items() if accept(*self.docs[id][:3])
+        )
+        return heapq.nlargest(limit, candidates)
+
+
+class SearchIndex:
+    """Per-user inverted indexes for databases without a full-text index.
+
+    Archived rows are indexed along with the hot ones and kept whole in the
+    index, since expense no longer has them; an index is rebuilt when the
+    archive boundary moves. On MySQL, where FULLTEXT covers the hot rows,
+    the index holds the archived rows only.
+
+    Each index remembers the user's data version (response_cache) it matches.
+    Single writes from this worker are added in place through add(). When the
+    version has moved any other way (other workers, group commit, bulk
+    import), the next search fetches rows with a higher id and rebuilds the
+    index if the user's row count still disagrees, which catches rows that
+    committed out of id order and purged months. Loading streams
+    SEARCH_LOAD_BATCH rows at a time. Only the SEARCH_INDEX_USERS most
+    recently searched users are kept in memory.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users = OrderedDict()
+
+    @staticmethod
+    async def _restart(user_id: int, index: UserIndex, archive):
+        # Empties the index and indexes the user's archived rows
+        index.clear()
+        index.boundary = archive.boundary
+        async for row in archive.stream(user_id, columns=ARCHIVED_COLUMNS):
+            index.add(
+                row.id, row.description, row.created_at, row.category_id, row.amount
+            )
+            index.archived[row.id] = row
+
+    @staticmethod
+    async def _load(db, user_id: int, index: UserIndex, archive):
+        query = (
+            select(
+                Expense.id,
+                Expense.description,
+                Expense.created_at,
+                Expense.category_id,
+                Expense.amount,
+            )
+            .where(
+                Expense.user_id == user_id,
+                Expense.id > index.loaded_id,
+                *archive.hot_conditions(),
+            )
+            .order_by(Expense.id)
+            .execution_options(yield_per=SEARCH_LOAD_BATCH)
+        )
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            for row in rows:
+                index.add(*row)
+            index.loaded_id = rows[-1].id
+
+    async def get(self, db, user_id: int, archive, hot: bool = True) -> UserIndex:
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = UserIndex()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+
+        async with index.lock:
+            if index.boundary != archive.boundary:
+                await self._restart(user_id, index, archive)
+            if not hot:
+                return index
+            # Read before loading, so a write racing the load moves the
+            # version again and is looked at on the next search
+            version = await response_cache.version(user_id)
+            if index.version != version:
+                await self._load(db, user_id, index, archive)
+                count = await db.scalar(
+                    select(func.count()).where(
+                        Expense.user_id == user_id, *archive.hot_conditions()
+                    )
+                )
+                if count + len(index.archived) != len(index.docs):
+                    await self._restart(user_id, index, archive)
+                    await self._load(db, user_id, index, archive)
+                index.version = version
+        return index
+
+    def add(self, user_id: int, version: int, row):
+        """Adds a row written by this worker, whose commit moved the user to
+        version. Any other gap is left for get() to resolve."""
+        index = self._users.get(user_id)
+        if index is None or index.lock.locked() or index.version != version - 1:
+            return
+        index.add(*row)
+        index.loaded_id = max(index.loaded_id, row[0])
+        index.version = version
+
+
+search_index = SearchIndex(get_settings().search_index_users)
@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import time
+import uuid
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.user_session import UserSession
+from ..utils.clock import utcnow
+from .config import get_settings
+from .database import open_session
+
+settings = get_settings()
+logger = logging.getLogger("budget_tracker.sessions")
+
+ACCESS_LIFETIME = timedelta(minutes=settings.access_token_expire_minutes)
+REFRESH_LIFETIME = timedelta(days=settings.refresh_token_expire_days)
+# How long the refresh jti replaced by a rotation is still accepted
+REUSE_GRACE = timedelta(seconds=settings.refresh_reuse_grace_seconds)
+# Revocations committed while a sync is running are picked up by the next one
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+class RevocationSet:
+    """Revoked session ids, checked by AuthMiddleware on every request.
+
+    A session stays in the set until the last access token issued for it has
+    expired, so the set only holds revocations from the last
+    ACCESS_TOKEN_EXPIRE_MINUTES. Revocations from other workers arrive
+    through sync(), which reads only recently revoked rows.
+    """
+
+    def __init__(self):
+        self._revoked = {}  # session id -> time the entry can be dropped
+        self.watermark = None
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, session_id: str, revoked_at: datetime):
+        self._revoked[session_id] = revoked_at + ACCESS_LIFETIME
+
+    async def sync(self, db: AsyncSession):
+        started = utcnow()
+        since = (
+            started - ACCESS_LIFETIME
+            if self.watermark is None
+            else self.watermark - SYNC_OVERLAP
+        )
+        query = select(UserSession.id, UserSession.revoked_at).where(
+            UserSession.revoked_at >= since
+        )
+        for row in await db.execute(query):
+            self.add(row.id, row.revoked_at)
+        self.watermark = started
+
+    def purge(self):
+        now = utcnow()
+        for session_id in [s for s, until in self._revoked.items() if until <= now]:
+            del self._revoked[session_id]
+
+
+revoked_sessions = RevocationSet()
+
+
+def create_session(db: AsyncSession, user_id: int):
+    """Adds a session row and returns (session id, refresh token jti); the
+    caller commits."""
+    now = utcnow()
+    session = UserSession(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        refresh_jti=uuid.uuid4().hex,
+        created_at=now,
+        expires_at=now + REFRESH_LIFETIME,
+    )
+    db.add(session)
+    return session.id, session.refresh_jti
+
+
+async def rotate_session(db: AsyncSession, session_id: str, jti: str):
+    """Swaps the session's refresh jti for a new one and returns it.
+
+    The replaced jti stays valid for REFRESH_REUSE_GRACE_SECONDS, so two
+    /refresh calls racing with the same cookie (two tabs, a retried request)
+    both succeed: the late one gets the jti the first one issued. Presenting
+    any other jti that is no longer current means the token was replayed,
+    so the whole session is revoked and None returned. The caller commits.
+    """
+    now = utcnow()
+    new_jti = uuid.uuid4().hex
+    result = await db.execute(
+        update(UserSession)
+        .where(
+            UserSession.id == session_id,
+            UserSession.refresh_jti == jti,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > now,
+        )
+        .values(
+            refresh_jti=new_jti,
+            previous_jti=jti,
+            rotated_at=now,
+            expires_at=now + REFRESH_LIFETIME,
+        )
+    )
+    if result.rowcount == 1:
+        return new_jti
+
+    current_jti = await db.scalar(
+        select(UserSession.refresh_jti).where(
+            UserSession.id == session_id,
+            UserSession.previous_jti == jti,
+            UserSession.rotated_at > now - REUSE_GRACE,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > now,
+        )
+    )
+    if current_jti is not None:
+        return current_jti
+    await revoke_session(db, session_id)
+    return None
+
+
+async def revoke_session(db: AsyncSession, session_id: str):
+    now = utcnow()
+    await db.execute(
+        update(UserSession)
+        .where(UserSession.id == session_id, UserSession.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    revoked_sessions.add(session_id, now)
+
+
+async def purge_sessions(db: AsyncSession):
+    now = utcnow()
+    await db.execute(
+        delete(UserSession).where(
+            or_(
+                UserSession.expires_at <= now,
+                UserSession.revoked_at < now - ACCESS_LIFETIME - SYNC_OVERLAP,
+            )
+        )
+    )
+    await db.commit()
+
+
+async def maintain_sessions():
+    """Background task: syncs the revocation set every
+    REVOCATION_SYNC_SECONDS and deletes dead sessions every
+    SESSION_PURGE_SECONDS."""
+    last_purge = time.monotonic()
+    while True:
+        try:
+            async with open_session() as db:
+                await revoked_sessions.sync(db)
+                if time.monotonic() - last_purge >= settings.session_purge_seconds:
+                    await purge_sessions(db)
+                    last_purge = time.monotonic()
+            revoked_sessions.purge()
+        except Exception:
+            logger.exception("session maintenance failed")
+        await asyncio.sleep(settings.revocation_sync_seconds)
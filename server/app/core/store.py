@@ -0,0 +1,84 @@
+import threading
+import time
+from .config import get_settings
+
+
+class LocalStore:
+    """In-process stand-in for the shared key/value store."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    async def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    async def set(self, key, value, ttl: float = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    async def incr(self, key, amount: int = 1, ttl: float = None):
+        # ttl only applies when the key is created
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                value, expires_at = int(entry[0]) + amount, entry[1]
+            else:
+                value, expires_at = amount, time.time() + ttl if ttl else None
+            self._data[key] = (value, expires_at)
+            return value
+
+    async def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    async def close(self):
+        pass
+
+
+class RedisStore:
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def get(self, key):
+        return await self._redis.get(key)
+
+    async def set(self, key, value, ttl: float = None):
+        await self._redis.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def incr(self, key, amount: int = 1, ttl: float = None):
+        value = await self._redis.incrby(key, amount)
+        if ttl and value == amount:
+            await self._redis.pexpire(key, int(ttl * 1000))
+        return value
+
+    async def delete(self, key):
+        await self._redis.delete(key)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_store(url: str = None):
+    url = url or get_settings().shared_store_url
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    return LocalStore()
+
+
+shared_store = create_store()
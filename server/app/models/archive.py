@@ -0,0 +1,15 @@
+from ..core.database import Base
+from sqlalchemy import Column, String, Integer, Date, DateTime
+
+
+class ExpenseArchive(Base):
+    """One month of expenses moved to a Parquet file by archive-expenses."""
+
+    __tablename__ = "expense_archive"
+
+    month = Column(Date, primary_key=True)
+    path = Column(String(255), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+    # Set once the month's rows have been deleted from expense
+    purged_at = Column(DateTime, nullable=True)
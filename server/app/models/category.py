@@ -1,6 +1,6 @@
 from ..core.database import Base, engine
 from sqlalchemy.sql import func
-from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy import Column, String, Integer, DateTime, Index
 
 
 class Category(Base):
@@ -10,3 +10,5 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_category_name_lower", func.lower(name)),)
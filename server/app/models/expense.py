@@ -1,24 +1,41 @@
-from ..core.database import Base
+from ..core.database import Base, engine
 from sqlalchemy.sql import func
-from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from ..utils.clock import utcnow
 
 
 class Expense(Base):
 
     __tablename__ = "expense"
+    __table_args__ = (
+        Index("ix_expense_user_created", "user_id", "created_at"),
+        Index(
+            "ix_expense_user_category_created", "user_id", "category_id", "created_at"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     amount = Column(Integer, nullable=False)
     description = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Stored as naive UTC; rollup days and time zone conversions rely on it
+    created_at = Column(
+        DateTime(timezone=True), default=utcnow, server_default=func.now()
+    )
     updated_at = Column(
         DateTime(timezone=True),
+        default=utcnow,
         server_default=func.now(),
-        onupdate=func.now(),
+        onupdate=utcnow,
     )
 
     category = relationship("Category")
     user = relationship("User")
+
+
+# MySQL only, like migration 0004; elsewhere app.core.search serves /search
+# from memory and the model must not declare the index either
+if engine.dialect.name == "mysql":
+    Index("ix_expense_description_ft", Expense.description, mysql_prefix="FULLTEXT")
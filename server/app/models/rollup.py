@@ -0,0 +1,21 @@
+from ..core.database import Base
+from sqlalchemy import Column, Integer, BigInteger, Date, ForeignKey
+
+
+class DailyTotal(Base):
+
+    __tablename__ = "expense_daily_total"
+
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, ForeignKey("category.id"), primary_key=True)
+    amount = Column(BigInteger, nullable=False, default=0)
+
+
+class CategoryTotal(Base):
+
+    __tablename__ = "expense_category_total"
+
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("category.id"), primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
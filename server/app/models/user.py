@@ -9,7 +9,7 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), nullable=False)
-    email = Column(String(50), nullable=False)
+    email = Column(String(50), nullable=False, unique=True, index=True)
     password = Column(String(255), nullable=False)
     refresh_token = Column(Text, nullable=True)
     access_token = Column(Text, nullable=True)
@@ -0,0 +1,22 @@
+from ..core.database import Base
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+
+
+class UserSession(Base):
+    """One login; its refresh token is rotated on every /refresh."""
+
+    __tablename__ = "user_session"
+    __table_args__ = (
+        Index("ix_user_session_revoked_at", "revoked_at"),
+        Index("ix_user_session_expires_at", "expires_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
+    refresh_jti = Column(String(32), nullable=False)
+    # The jti replaced by the last rotation, still accepted for a short while
+    previous_jti = Column(String(32), nullable=True)
+    rotated_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
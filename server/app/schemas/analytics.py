@@ -0,0 +1,75 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+
+class TimeseriesPoint(BaseModel):
+    bucket: date
+    amount: float
+    category_id: Optional[int] = None
+    name: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+class TimeseriesResponse(BaseModel):
+    status: int
+    message: str
+    data: List[TimeseriesPoint]
+
+
+class ReportTotals(BaseModel):
+    income: float
+    spend: float
+    net: float
+    count: int
+
+
+class ReportPercentiles(BaseModel):
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    mean: Optional[float]
+    max: Optional[float]
+
+
+class ReportCategory(BaseModel):
+    category_id: int
+    name: Optional[str]
+    income: bool
+    total: float
+    count: int
+    share: Optional[float]
+
+
+class ReportMonth(BaseModel):
+    month: date
+    income: float
+    spend: float
+    net: float
+    spend_delta: Optional[float]
+    spend_delta_pct: Optional[float]
+
+
+class ReportDay(BaseModel):
+    date: date
+    income: float
+    spend: float
+    balance: float
+    spend_avg: float
+
+
+class ReportData(BaseModel):
+    start: date
+    end: date
+    totals: ReportTotals
+    percentiles: ReportPercentiles
+    categories: List[ReportCategory]
+    monthly: List[ReportMonth]
+    daily: List[ReportDay]
+
+
+class ReportResponse(BaseModel):
+    status: int
+    message: str
+    data: ReportData
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class AddTransaction(BaseModel):
@@ -16,6 +16,18 @@ class AddTransaction(BaseModel):
     amount: int = Field(..., gt=0, description="Enter a valid amount")
 
 
+class ImportTransaction(AddTransaction):
+    # Bulk rows may be backdated; times are stored as naive UTC
+    created_at: Optional[datetime] = None
+
+    @field_validator("created_at")
+    @classmethod
+    def to_naive_utc(cls, value):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class AddTransactionResponse(BaseModel):
     status: int
     message: str
@@ -23,6 +35,23 @@ class AddTransactionResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class BulkRowError(BaseModel):
+    row: int
+    message: str
+
+
+class BulkImportData(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]
+
+
+class BulkImportResponse(BaseModel):
+    status: int
+    message: str
+    data: BulkImportData
+
+
 class AllData(BaseModel):
     id: int
     name: str
@@ -38,6 +67,7 @@ class AllDataResponse(BaseModel):
     status: int
     message: str
     data: List[AllData]
+    next_cursor: Optional[str] = None
 
 
 class CategoryData(BaseModel):
@@ -78,3 +108,19 @@ class FilterDataResponse(BaseModel):
     status: int
     message: str
     data: List[FilterData]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_amount: Optional[float] = None
+
+
+class DashboardData(BaseModel):
+    recent: List[AllData]
+    next_cursor: Optional[str] = None
+    categories: List[CategoryData]
+    daily: List[DateData]
+
+
+class DashboardResponse(BaseModel):
+    status: int
+    message: str
+    data: DashboardData
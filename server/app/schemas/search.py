@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class SearchResult(BaseModel):
+    id: int
+    name: Optional[str]
+    amount: int
+    description: str
+    created_at: Optional[datetime]
+    score: float
+
+    model_config = {"from_attributes": True}
+
+
+class SearchResponse(BaseModel):
+    status: int
+    message: str
+    data: List[SearchResult]
@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timedelta
+from ..core.archive import archive_catalog
+from ..core.database import engine, get_db
+from ..core.category_cache import category_cache
+from ..core.response_cache import cached_response
+from ..models.expense import Expense
+from ..models.rollup import DailyTotal
+from ..schemas.analytics import TimeseriesPoint, TimeseriesResponse, ReportResponse
+from ..utils.clock import utcnow
+from ..utils.filters import excluding_categories, including_categories
+from ..utils.reporting import MAX_REPORT_DAYS, build_report
+from ..utils.response import RowSerializer, json_response
+from ..utils.timeseries import (
+    MAX_BUCKETS,
+    TZ_DIALECTS,
+    bucket_count,
+    bucket_start,
+    combine_buckets,
+    default_start,
+    get_timezone,
+    in_timezone,
+    is_utc,
+    local_buckets,
+    local_today,
+    to_utc,
+)
+
+analytics_router = APIRouter()
+
+timeseries_serializer = RowSerializer(TimeseriesPoint)
+
+
+def invalid_range_response(message: str):
+    return json_response(message=message, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+@analytics_router.get("/timeseries", response_model=TimeseriesResponse)
+@cached_response
+async def timeseries(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    bucket: str = Query("month", pattern="^(day|week|month|year)$"),
+    start: date = Query(None),
+    end: date = Query(None),
+    tz: str = Query("UTC"),
+    by_category: bool = Query(False),
+    q: str = Query(None),
+):
+    # start is inclusive and end exclusive, both as local dates in tz
+    user_id = int(request.state.user["sub"])
+    zone = get_timezone(tz)
+    if zone is None:
+        return invalid_range_response("Unknown timezone")
+
+    if end is None:
+        end = local_today(zone) + timedelta(days=1)
+    if start is None:
+        start = default_start(end, bucket)
+    if start >= end:
+        return invalid_range_response("start must be before end")
+    if bucket_count(start, end, bucket) > MAX_BUCKETS:
+        return invalid_range_response("Range has too many buckets, use a larger one")
+
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    dialect = engine.dialect.name
+
+    if is_utc(zone):
+        # Daily rollups are kept in UTC days, so buckets fold those rows
+        period = bucket_start(DailyTotal.day, bucket, dialect)
+        category_col = DailyTotal.category_id
+        query = select(
+            period.label("bucket"), func.sum(DailyTotal.amount).label("amount")
+        ).where(
+            DailyTotal.user_id == user_id,
+            DailyTotal.day >= start,
+            DailyTotal.day < end,
+        )
+    else:
+        category_col = Expense.category_id
+        if dialect in TZ_DIALECTS:
+            local_time = in_timezone(Expense.created_at, tz, dialect)
+            period = bucket_start(local_time, bucket, dialect)
+            query = select(
+                period.label("bucket"), func.sum(Expense.amount).label("amount")
+            )
+        else:
+            query = select(Expense.created_at, Expense.category_id, Expense.amount)
+        query = query.where(
+            Expense.user_id == user_id,
+            Expense.created_at >= to_utc(start, zone),
+            Expense.created_at < to_utc(end, zone),
+            *archive.hot_conditions(),
+        )
+
+    if q == "income":
+        query = query.where(category_col.in_(categories.income_ids))
+        accept = including_categories(categories.income_ids)
+    else:
+        query = query.where(category_col.not_in(categories.income_ids))
+        accept = excluding_categories(categories.income_ids)
+
+    archived = []
+    if not is_utc(zone):
+        # The rollups keep archived months; the expense rows do not
+        archived = await archive.amounts(
+            user_id, to_utc(start, zone), to_utc(end, zone), accept
+        )
+
+    if not is_utc(zone) and dialect not in TZ_DIALECTS:
+        hot = (await db.execute(query)).all()
+        rows = local_buckets(hot + archived, zone, bucket, by_category)
+    else:
+        if by_category:
+            query = (
+                query.add_columns(category_col.label("category_id"))
+                .group_by(period, category_col)
+                .order_by(period, category_col)
+            )
+        else:
+            query = query.group_by(period).order_by(period)
+        rows = [
+            (row.bucket, row.category_id if by_category else None, row.amount)
+            for row in await db.execute(query)
+        ]
+        if archived:
+            rows = combine_buckets(
+                rows, local_buckets(archived, zone, bucket, by_category)
+            )
+
+    if by_category:
+        categories = await category_cache.covering(
+            categories, {category_id for _, category_id, _ in rows}
+        )
+    data = timeseries_serializer.rows(
+        {
+            "bucket": first_day,
+            "amount": amount,
+            "category_id": category_id,
+            "name": categories.names.get(category_id) if by_category else None,
+        }
+        for first_day, category_id, amount in rows
+    )
+    return json_response(data)
+
+
+@analytics_router.get("/report", response_model=ReportResponse)
+@cached_response
+async def report(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    start: date = Query(None),
+    end: date = Query(None),
+    window: int = Query(7, gt=0, le=90),
+):
+    # Defaults to the current calendar year; end is exclusive
+    user_id = int(request.state.user["sub"])
+    today = utcnow().date()
+    if start is None:
+        start = date(today.year, 1, 1)
+    if end is None:
+        end = date(start.year + 1, 1, 1)
+    if start >= end:
+        return invalid_range_response("start must be before end")
+    if (end - start).days > MAX_REPORT_DAYS:
+        return invalid_range_response("Report range is limited to 10 years")
+
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    start_at = datetime.combine(start, datetime.min.time())
+    end_at = datetime.combine(end, datetime.min.time())
+    query = select(
+        func.date(Expense.created_at).label("day"),
+        Expense.category_id,
+        Expense.amount,
+    ).where(
+        Expense.user_id == user_id,
+        Expense.created_at >= start_at,
+        Expense.created_at < end_at,
+        *archive.hot_conditions(),
+    )
+
+    # One fetch, transposed into columns for the array maths
+    rows = (await db.execute(query)).all()
+    rows += [
+        (created_at.date(), category_id, amount)
+        for created_at, category_id, amount in await archive.amounts(
+            user_id, start_at, end_at
+        )
+    ]
+    days, category_ids, amounts = zip(*rows) if rows else ((), (), ())
+    categories = await category_cache.covering(categories, set(category_ids))
+
+    data = build_report(
+        days,
+        category_ids,
+        amounts,
+        start,
+        end,
+        categories.income_ids,
+        categories.names,
+        window,
+    )
+    return json_response(data)
@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, status, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
+from ..core.category_cache import category_cache
 from ..models.category import Category
 from ..schemas.category import (
     CreateCategory,
     CategoryResponse,
     AllCategoryResponse,
-    AllCategoryData,
     CategoryDataResponse,
 )
 from fastapi.responses import JSONResponse
@@ -16,11 +16,9 @@ category_router = APIRouter()
 
 
 @category_router.post("/add_category", response_model=CategoryResponse)
-def add_category(category: CreateCategory, db: Session = Depends(get_db)):
-    existing_category = (
-        db.query(Category)
-        .filter(func.lower(Category.name) == category.name.lower())
-        .first()
+async def add_category(category: CreateCategory, db: AsyncSession = Depends(get_db)):
+    existing_category = await db.scalar(
+        select(Category).where(func.lower(Category.name) == category.name.lower())
     )
 
     if existing_category:
@@ -37,8 +35,9 @@ def add_category(category: CreateCategory, db: Session = Depends(get_db)):
     )
 
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    await db.commit()
+    await db.refresh(new_category)
+    await category_cache.invalidate()
     data = CategoryDataResponse.model_validate(new_category)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -51,10 +50,16 @@ def add_category(category: CreateCategory, db: Session = Depends(get_db)):
 
 
 @category_router.get("/all_category", response_model=AllCategoryResponse)
-def all_category(db: Session = Depends(get_db)):
-    categories = db.query(Category).all()
-    data = [AllCategoryData.model_validate(cat).model_dump() for cat in categories]
-    return JSONResponse(
+async def all_category(request: Request):
+    snapshot = await category_cache.get()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("If-None-Match") == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=snapshot.body,
         status_code=status.HTTP_200_OK,
-        content={"status": status.HTTP_200_OK, "message": "Ok", "data": data},
+        media_type="application/json",
+        headers=headers,
     )
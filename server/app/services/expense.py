@@ -1,169 +1,681 @@
 from fastapi import APIRouter, Depends, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.archive import archive_catalog, merge_sorted, sort_key
 from ..core.database import get_db
+from ..core.category_cache import category_cache
+from ..core.group_commit import group_commit_writer
+from ..core.replicas import get_read_db, note_write
+from ..core.response_cache import cached_response, response_cache
+from ..core.search import search_index
 from ..models.expense import Expense
-from ..models.category import Category
+from ..models.rollup import DailyTotal, CategoryTotal
 from ..schemas.expense import (
     AddTransaction,
     AddTransactionResponse,
+    BulkImportResponse,
     AllData,
     AllDataResponse,
     CategoryDataResponse,
     CategoryData,
     DateData,
     DateDataResponse,
+    DashboardResponse,
     FilterData,
     FilterDataResponse,
+    ImportTransaction,
 )
-from fastapi.responses import JSONResponse
-from sqlalchemy import func
+from ..utils import rollup
+from ..utils.clock import utcnow
+from ..utils.importers import iter_csv_rows, iter_ofx_rows
+from ..utils.export import EXPORT_BATCH_SIZE, EXPORT_WRITERS, GzipWriter
+from ..utils.filters import (
+    date_bounds,
+    excluding_categories,
+    filter_conditions,
+    filter_predicate,
+)
+from ..utils.response import RowSerializer, dumps, json_response
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    STREAM_BATCH_SIZE,
+    decode_cursor,
+    keyset_filter,
+    next_cursor,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Date, cast, func, insert, literal, null, select, union_all
+from pydantic import ValidationError
 from fastapi import Query
-from datetime import date
+from typing import List
+from datetime import date, datetime, time
 
 expense_router = APIRouter()
 
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ERRORS = 1000
 
-@expense_router.post("/add_expense", response_model=AddTransactionResponse)
-def add_expense(data: AddTransaction, db: Session = Depends(get_db)):
-    new_expense = Expense(
-        category_id=data.category_id,
-        user_id=data.user_id,
-        description=data.description,
-        amount=data.amount,
+all_serializer = RowSerializer(AllData)
+category_serializer = RowSerializer(CategoryData)
+date_serializer = RowSerializer(DateData)
+filter_serializer = RowSerializer(FilterData)
+
+
+def invalid_cursor_response():
+    return json_response(
+        message="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST
     )
 
-    db.add(new_expense)
-    db.commit()
-    db.refresh(new_expense)
 
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "status": status.HTTP_200_OK,
-            "message": "Add successfully",
-        },
+def with_category_name(row, names: dict):
+    # Category names come from the cached catalogue instead of a join
+    return {**row._mapping, "name": names.get(row.category_id)}
+
+
+# sort option -> (column, descending, cursor value parser, row key)
+FILTER_SORTS = {
+    "-created_at": (Expense.created_at, True, datetime.fromisoformat, "created_at"),
+    "created_at": (Expense.created_at, False, datetime.fromisoformat, "created_at"),
+    "-amount": (Expense.amount, True, int, "amount"),
+    "amount": (Expense.amount, False, int, "amount"),
+}
+
+
+# Columns read from archived months for /filter and /export rows
+FILTER_COLUMNS = ("id", "created_at", "amount", "category_id")
+EXPORT_COLUMNS = ("id", "created_at", "category_id", "amount", "description")
+
+
+def with_filter_date(row, names: dict):
+    data = with_category_name(row, names)
+    created_at = row.created_at
+    data["date"] = datetime.combine(created_at, time.min) if created_at else None
+    return data
+
+
+async def stream_export(db: AsyncSession, query, writer, names: dict, archived=None):
+    def write(rows):
+        return writer.write(
+            [{**row._mapping, "category": names.get(row.category_id)} for row in rows]
+        )
+
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        chunk = write(rows)
+        if chunk:
+            yield chunk
+    # Archived rows are older than every hot one, so they follow in order
+    if archived is not None:
+        async for rows in archived:
+            chunk = write(rows)
+            if chunk:
+                yield chunk
+    yield writer.close()
+
+
+async def stream_ndjson(
+    db: AsyncSession,
+    query,
+    serializer,
+    names: dict,
+    mapper=with_category_name,
+    archived=None,
+    key: str = "created_at",
+    descending: bool = True,
+):
+    # Server-side cursor: rows are fetched and encoded one batch at a time
+    rows = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    if archived is not None:
+        rows = merge_sorted(rows, archived, sort_key(key), descending)
+    async for row in rows:
+        yield dumps(serializer.row(mapper(row, names))) + b"\n"
+
+
+@expense_router.post("/add_expense", response_model=AddTransactionResponse)
+async def add_expense(data: AddTransaction, db: AsyncSession = Depends(get_db)):
+    created_at = utcnow()
+    if group_commit_writer is not None:
+        await group_commit_writer.submit(
+            {**data.model_dump(), "created_at": created_at}
+        )
+        # Batched rows have no id here; moving the data version makes the
+        # user's search index catch up on its next search
+        await response_cache.bump(data.user_id)
+    else:
+        new_expense = Expense(
+            category_id=data.category_id,
+            user_id=data.user_id,
+            description=data.description,
+            amount=data.amount,
+            created_at=created_at,
+        )
+
+        db.add(new_expense)
+        await db.run_sync(
+            rollup.apply_expense,
+            data.user_id,
+            data.category_id,
+            data.amount,
+            created_at.date(),
+        )
+        # flush assigns the id without the SELECT a refresh would cost
+        await db.flush()
+        expense_id = new_expense.id
+        await db.commit()
+        version = await response_cache.bump(data.user_id)
+        search_index.add(
+            data.user_id,
+            version,
+            (
+                expense_id,
+                data.description,
+                created_at,
+                data.category_id,
+                data.amount,
+            ),
+        )
+    await note_write(data.user_id)
+
+    return json_response(message="Add successfully")
+
+
+def bulk_error_response(message: str):
+    return json_response(message=message, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+@expense_router.post("/add_expense/bulk", response_model=BulkImportResponse)
+async def add_expense_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    user_id = int(request.state.user["sub"])
+    default_category = None
+    ofx = False
+
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        default_category = form.get("category_id")
+        filename = (getattr(upload, "filename", None) or "").lower()
+
+        if filename.endswith(".csv"):
+            rows = iter_csv_rows(upload.file)
+        elif filename.endswith((".ofx", ".qfx")):
+            rows = iter_ofx_rows(upload.file)
+            ofx = True
+        else:
+            return bulk_error_response("Upload a CSV or OFX file")
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            return bulk_error_response("Invalid JSON body")
+        if not isinstance(rows, list):
+            return bulk_error_response("Expected a JSON array of expenses")
+
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    now = utcnow()
+    inserted = 0
+    failed = 0
+    errors = []
+    chunk = []
+    totals = {}
+    reloaded = False
+
+    for index, row in enumerate(rows, start=1):
+        message = None
+        if not isinstance(row, dict):
+            message = "Row must be an object"
+        else:
+            row = {**row, "user_id": user_id}
+            # Money in (OFX credits) is booked as income; the parser sets the
+            # flag, and a "credit" field in CSV or JSON rows is dropped
+            credit = row.pop("credit", False) is True and ofx
+            if credit and categories.income_ids:
+                row["category_id"] = categories.income_ids[0]
+            elif not row.get("category_id"):
+                row["category_id"] = default_category
+            if not row.get("created_at"):
+                row["created_at"] = None
+            try:
+                item = ImportTransaction.model_validate(row)
+            except ValidationError as exc:
+                message = exc.errors()[0].get("msg", "Validation error")
+            else:
+                if item.category_id not in categories.names and not reloaded:
+                    # Possibly added on another worker; one reload per import
+                    categories = await category_cache.covering(
+                        categories, (item.category_id,)
+                    )
+                    reloaded = True
+                if credit and not categories.income_ids:
+                    message = "Credits need an income category"
+                elif item.category_id not in categories.names:
+                    message = "Select a valid category"
+                elif not isinstance(item.description, str):
+                    message = "Description is required"
+                elif archive.covers(item.created_at or now):
+                    message = "Date falls in an archived month"
+
+        if message:
+            failed += 1
+            if len(errors) < BULK_MAX_ERRORS:
+                errors.append({"row": index, "message": message})
+            continue
+
+        created_at = item.created_at or now
+        chunk.append({**item.model_dump(), "created_at": created_at})
+        key = (item.category_id, created_at.date())
+        totals[key] = totals.get(key, 0) + item.amount
+
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await db.execute(insert(Expense), chunk)
+            inserted += len(chunk)
+            chunk = []
+
+    if chunk:
+        await db.execute(insert(Expense), chunk)
+        inserted += len(chunk)
+
+    for (category_id, day), amount in totals.items():
+        await db.run_sync(rollup.apply_expense, user_id, category_id, amount, day)
+    await db.commit()
+    if inserted:
+        await response_cache.bump(user_id)
+        await note_write(user_id)
+
+    return json_response(
+        {"inserted": inserted, "failed": failed, "errors": errors},
+        message="Import finished",
     )
 
 
 @expense_router.get("/all", response_model=AllDataResponse)
-def all_transaction(request: Request, db: Session = Depends(get_db)):
+@cached_response
+async def all_transaction(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: str = Query(None),
+    stream: bool = Query(False),
+):
     user_id = int(request.state.user["sub"])
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    not_income = excluding_categories(categories.income_ids)
 
     all = (
-        db.query(
+        select(
             Expense.id,
             Expense.amount,
             Expense.description,
             Expense.created_at,
             Expense.updated_at,
-            Category.name.label("name"),
+            Expense.category_id,
+        )
+        .where(
+            (Expense.user_id == user_id)
+            & (Expense.category_id.not_in(categories.income_ids)),
+            *archive.hot_conditions(),
         )
-        .join(Category, Expense.category_id == Category.id)
-        .where((Expense.user_id == user_id) & (Category.name != "income"))
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
     )
-    data = [AllData.model_validate(exp).model_dump(mode="json") for exp in all]
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "status": status.HTTP_200_OK,
-            "message": "Add successfully",
-            "data": data,
-        },
+
+    if stream:
+        archived = archive.stream(user_id, not_income)
+        return StreamingResponse(
+            stream_ndjson(db, all, all_serializer, categories.names, archived=archived),
+            media_type="application/x-ndjson",
+        )
+
+    position = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if not position:
+            return invalid_cursor_response()
+        all = all.where(keyset_filter(Expense.created_at, Expense.id, position))
+
+    rows = (await db.execute(all.limit(limit + 1))).all()
+    rows = await archive.page(rows, limit, user_id, not_income, position=position)
+    categories = await category_cache.covering(
+        categories, {exp.category_id for exp in rows}
+    )
+    data = [
+        all_serializer.row(with_category_name(exp, categories.names))
+        for exp in rows[:limit]
+    ]
+    return json_response(
+        data, message="Add successfully", next_cursor=next_cursor(rows, limit)
     )
 
 
 @expense_router.get("/category_wise", response_model=CategoryDataResponse)
-def category_wise(request: Request, db: Session = Depends(get_db)):
+@cached_response
+async def category_wise(request: Request, db: AsyncSession = Depends(get_read_db)):
     user_id = int(request.state.user["sub"])
+    categories = await category_cache.get()
 
-    all = (
-        db.query(
-            Category.name.label("name"),
-            func.sum(Expense.amount).label("total"),
-        )
-        .join(Category, Expense.category_id == Category.id)
-        .where((Expense.user_id == user_id))
-        .group_by(Category.name)
+    all = select(CategoryTotal.category_id, CategoryTotal.total).where(
+        CategoryTotal.user_id == user_id
     )
 
-    data = [CategoryData.model_validate(exp).model_dump() for exp in all]
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "status": status.HTTP_200_OK,
-            "message": "Ok",
-            "data": data,
-        },
+    rows = (await db.execute(all)).all()
+    categories = await category_cache.covering(
+        categories, {exp.category_id for exp in rows}
     )
+    totals = {}
+    for exp in rows:
+        name = categories.names.get(exp.category_id)
+        totals[name] = totals.get(name, 0) + exp.total
+
+    data = category_serializer.rows(
+        {"name": name, "total": total} for name, total in totals.items()
+    )
+    return json_response(data)
 
 
 @expense_router.get("/date_wise", response_model=DateDataResponse)
-def date_wise(request: Request, db: Session = Depends(get_db), q: str = Query(None)):
+@cached_response
+async def date_wise(
+    request: Request, db: AsyncSession = Depends(get_read_db), q: str = Query(None)
+):
     user_id = int(request.state.user["sub"])
-    query = (
-        db.query(
-            func.date(Expense.created_at).label("date"),
-            func.sum(Expense.amount).label("amount"),
-        )
-        .join(Category, Expense.category_id == Category.id)
-        .filter(Expense.user_id == user_id)
-    )
+    categories = await category_cache.get()
+    query = select(
+        DailyTotal.day.label("date"),
+        func.sum(DailyTotal.amount).label("amount"),
+    ).where(DailyTotal.user_id == user_id)
 
     if q == "income":
-        query = query.filter(Category.name == "income")
+        query = query.where(DailyTotal.category_id.in_(categories.income_ids))
     else:
-        query = query.filter(Category.name != "income")
+        query = query.where(DailyTotal.category_id.not_in(categories.income_ids))
+
+    all = query.group_by(DailyTotal.day).order_by(DailyTotal.day)
+
+    data = date_serializer.rows(await db.execute(all))
+    return json_response(data)
 
-    all = query.group_by(func.date(Expense.created_at)).order_by(
-        func.date(Expense.created_at)
+
+# Row kinds in the combined /dashboard query
+DASHBOARD_RECENT, DASHBOARD_CATEGORY, DASHBOARD_DAILY = 0, 1, 2
+
+
+@expense_router.get("/dashboard", response_model=DashboardResponse)
+@cached_response
+async def dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+):
+    """/all (first page), /category_wise and /date_wise in one query.
+
+    The three selects are UNION ALLed with a kind column and split again
+    here, so the page costs one pool checkout and one round trip.
+    """
+    user_id = int(request.state.user["sub"])
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+
+    recent = (
+        select(
+            literal(DASHBOARD_RECENT).label("kind"),
+            Expense.id,
+            Expense.category_id,
+            Expense.amount,
+            Expense.description,
+            Expense.created_at,
+            Expense.updated_at,
+            cast(null(), Date).label("day"),
+        )
+        .where(
+            (Expense.user_id == user_id)
+            & (Expense.category_id.not_in(categories.income_ids)),
+            *archive.hot_conditions(),
+        )
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+        .limit(limit + 1)
+        .subquery()
+    )
+    totals = select(
+        literal(DASHBOARD_CATEGORY),
+        null(),
+        CategoryTotal.category_id,
+        CategoryTotal.total,
+        null(),
+        null(),
+        null(),
+        null(),
+    ).where(CategoryTotal.user_id == user_id)
+    daily = (
+        select(
+            literal(DASHBOARD_DAILY),
+            null(),
+            null(),
+            func.sum(DailyTotal.amount),
+            null(),
+            null(),
+            null(),
+            DailyTotal.day,
+        )
+        .where(
+            (DailyTotal.user_id == user_id)
+            & (DailyTotal.category_id.not_in(categories.income_ids))
+        )
+        .group_by(DailyTotal.day)
+    )
+
+    query = union_all(select(recent), totals, daily)
+    columns = query.selected_columns
+    query = query.order_by(
+        columns.kind, columns.created_at.desc(), columns.id.desc(), columns.day
     )
 
-    data = [DateData.model_validate(exp).model_dump(mode="json") for exp in all]
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "status": status.HTTP_200_OK,
-            "message": "Ok",
-            "data": data,
-        },
+    recent_rows, category_rows, daily_rows = [], [], []
+    for row in await db.execute(query):
+        if row.kind == DASHBOARD_RECENT:
+            recent_rows.append(row)
+        elif row.kind == DASHBOARD_CATEGORY:
+            category_rows.append(row)
+        else:
+            daily_rows.append({"date": row.day, "amount": row.amount})
+    recent_rows = await archive.page(
+        recent_rows, limit, user_id, excluding_categories(categories.income_ids)
     )
+    categories = await category_cache.covering(
+        categories, {row.category_id for row in recent_rows + category_rows}
+    )
+    category_totals = {}
+    for row in category_rows:
+        name = categories.names.get(row.category_id)
+        category_totals[name] = category_totals.get(name, 0) + row.amount
+
+    data = {
+        "recent": [
+            all_serializer.row(with_category_name(exp, categories.names))
+            for exp in recent_rows[:limit]
+        ],
+        "next_cursor": next_cursor(recent_rows, limit),
+        "categories": category_serializer.rows(
+            {"name": name, "total": total} for name, total in category_totals.items()
+        ),
+        "daily": date_serializer.rows(daily_rows),
+    }
+    return json_response(data)
 
 
 @expense_router.get("/filter", response_model=FilterDataResponse)
-def table_filter(
+async def table_filter(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     sdate: date = Query(None),
     edate: date = Query(None),
     amount: int = Query(None),
-    category: int = Query(None),
+    min_amount: int = Query(None),
+    max_amount: int = Query(None),
+    category: List[int] = Query(None),
+    sort: str = Query("-created_at", pattern="^-?(created_at|amount)$"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: str = Query(None),
+    stream: bool = Query(False),
 ):
     user_id = int(request.state.user["sub"])
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    sort_col, descending, parse, key = FILTER_SORTS[sort]
+
+    # amount is kept as a shorthand for an exact min/max range
+    if amount is not None:
+        min_amount = max_amount = amount
+
+    conditions = [Expense.user_id == user_id] + filter_conditions(
+        sdate, edate, category, min_amount, max_amount
+    )
+    conditions += archive.hot_conditions()
+    # Archived months are only read when the date range reaches them
+    start, end = date_bounds(sdate, edate)
+    accept = filter_predicate(sdate, edate, category, min_amount, max_amount)
+    order = (
+        (sort_col.desc(), Expense.id.desc()) if descending else (sort_col, Expense.id)
+    )
     query = (
-        db.query(
-            func.date(Expense.created_at).label("date"),
+        select(
+            Expense.id,
+            Expense.created_at,
             Expense.amount.label("amount"),
-            Category.name.label("name"),
+            Expense.category_id,
         )
-        .join(Category, Expense.category_id == Category.id)
-        .filter(Expense.user_id == user_id)
+        .where(*conditions)
+        .order_by(*order)
     )
 
-    if sdate and edate:
-        query = query.filter(Expense.created_at.between(sdate, edate))
+    if stream:
+        archived = archive.stream(
+            user_id, accept, start, end, key, descending, columns=FILTER_COLUMNS
+        )
+        return StreamingResponse(
+            stream_ndjson(
+                db,
+                query,
+                filter_serializer,
+                categories.names,
+                with_filter_date,
+                archived,
+                key,
+                descending,
+            ),
+            media_type="application/x-ndjson",
+        )
 
-    if amount is not None:
-        query = query.filter(Expense.amount == amount)
-
-    if category is not None:
-        query = query.filter(Category.id == category)
-
-    data = [FilterData.model_validate(exp).model_dump(mode="json") for exp in query]
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "status": status.HTTP_200_OK,
-            "message": "Ok",
-            "data": data,
-        },
+    position = None
+    if cursor:
+        position = decode_cursor(cursor, parse)
+        if not position:
+            return invalid_cursor_response()
+        query = query.where(keyset_filter(sort_col, Expense.id, position, descending))
+    else:
+        # First page only: match count and sum ride along as scalar
+        # subqueries instead of costing a second round trip
+        matches = select(func.count()).where(*conditions).correlate(None)
+        spent = select(func.coalesce(func.sum(Expense.amount), 0))
+        spent = spent.where(*conditions).correlate(None)
+        query = query.add_columns(
+            matches.scalar_subquery().label("total"),
+            spent.scalar_subquery().label("total_amount"),
+        )
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+
+    extra = {}
+    if cursor:
+        rows = await archive.page(
+            rows,
+            limit,
+            user_id,
+            accept,
+            start,
+            end,
+            key,
+            descending,
+            position,
+            FILTER_COLUMNS,
+        )
+    else:
+        total = rows[0].total if rows else 0
+        total_amount = rows[0].total_amount if rows else 0
+        # Archived totals come from the same read as the archived page rows
+        rows, matched, spent = await archive.first_page(
+            rows, limit, user_id, accept, start, end, key, descending, FILTER_COLUMNS
+        )
+        extra["total"] = total + matched
+        extra["total_amount"] = float(total_amount + spent)
+    categories = await category_cache.covering(
+        categories, {exp.category_id for exp in rows}
+    )
+    data = [
+        filter_serializer.row(with_filter_date(exp, categories.names))
+        for exp in rows[:limit]
+    ]
+
+    return json_response(data, next_cursor=next_cursor(rows, limit, key), **extra)
+
+
+@expense_router.get("/export")
+async def export(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    sdate: date = Query(None),
+    edate: date = Query(None),
+    min_amount: int = Query(None),
+    max_amount: int = Query(None),
+    category: List[int] = Query(None),
+):
+    user_id = int(request.state.user["sub"])
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    query = (
+        select(
+            Expense.id,
+            Expense.created_at,
+            Expense.category_id,
+            Expense.amount,
+            Expense.description,
+        )
+        .where(
+            Expense.user_id == user_id,
+            *filter_conditions(sdate, edate, category, min_amount, max_amount),
+            *archive.hot_conditions(),
+        )
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+    )
+
+    try:
+        writer = EXPORT_WRITERS[format]()
+    except ImportError:
+        return json_response(
+            message="Parquet export is not available",
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="expenses.{writer.extension}"',
+        "Vary": "Accept-Encoding",
+    }
+    media_type = writer.media_type
+    # Parquet pages are compressed already
+    if format == "csv" and "gzip" in request.headers.get("accept-encoding", ""):
+        writer = GzipWriter(writer)
+        headers["Content-Encoding"] = "gzip"
+
+    start, end = date_bounds(sdate, edate)
+    archived = archive.batches(
+        user_id,
+        filter_predicate(sdate, edate, category, min_amount, max_amount),
+        start,
+        end,
+        columns=EXPORT_COLUMNS,
+    )
+    return StreamingResponse(
+        stream_export(db, query, writer, categories.names, archived),
+        media_type=media_type,
+        headers=headers,
     )
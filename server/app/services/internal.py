@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Request, Response
+import hmac
+from ..core.config import get_settings
+from ..core.database import engine, async_engine
+from ..core.instrumentation import render_metrics
+from ..core.response_cache import response_cache
+from ..core.ratelimit import limiter_stats
+from ..core.replicas import replica_set
+from ..utils.response import json_response
+from ..utils.token import access_token_cache, refresh_token_cache
+
+settings = get_settings()
+
+
+class InternalAuthError(Exception):
+    pass
+
+
+def require_internal_token(request: Request):
+    token = request.headers.get("X-Internal-Token", "")
+    authorization = request.headers.get("Authorization", "")
+    if not token and authorization.startswith("Bearer "):
+        token = authorization[len("Bearer ") :]
+    expected = settings.internal_api_token
+    if not expected or not hmac.compare_digest(token, expected):
+        raise InternalAuthError()
+
+
+internal_router = APIRouter(dependencies=[Depends(require_internal_token)])
+metrics_router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+def engine_pools():
+    pools = {"sync": engine.pool.stats()}
+    if async_engine is not None:
+        pools["async"] = async_engine.pool.stats()
+    for replica in replica_set.replicas:
+        for kind, stats in replica.pools().items():
+            pools[f"replica:{replica.host}:{kind}"] = stats
+    return pools
+
+
+@internal_router.get("/pool")
+async def pool_stats():
+    return json_response(engine_pools())
+
+
+@internal_router.get("/caches")
+async def cache_stats():
+    data = {
+        "access_token": access_token_cache.stats(),
+        "refresh_token": refresh_token_cache.stats(),
+        "response": response_cache.local.stats(),
+    }
+
+    return json_response(data)
+
+
+@internal_router.get("/limits")
+async def limit_stats():
+    return json_response(limiter_stats.snapshot())
+
+
+@metrics_router.get("/metrics")
+async def metrics():
+    return Response(
+        content=render_metrics(engine_pools(), limiter_stats.snapshot()),
+        media_type="text/plain; version=0.0.4",
+    )
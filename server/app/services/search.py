@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from datetime import date
+from ..core.archive import archive_catalog
+from ..core.database import engine, get_db
+from ..core.category_cache import category_cache
+from ..core.search import MAX_QUERY_TERMS, search_index, tokenize
+from ..models.expense import Expense
+from ..schemas.search import SearchResult, SearchResponse
+from ..utils.filters import date_bounds, filter_conditions, filter_predicate
+from ..utils.response import RowSerializer, json_response
+
+search_router = APIRouter()
+
+search_serializer = RowSerializer(SearchResult)
+
+SEARCH_COLUMNS = (
+    Expense.id,
+    Expense.amount,
+    Expense.description,
+    Expense.created_at,
+    Expense.category_id,
+)
+
+
+@search_router.get("/search", response_model=SearchResponse)
+async def search(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, gt=0, le=100),
+    sdate: date = Query(None),
+    edate: date = Query(None),
+    min_amount: int = Query(None),
+    max_amount: int = Query(None),
+    category: List[int] = Query(None),
+):
+    # Every word must match, each one as a prefix ("ub rid" finds "Uber ride")
+    user_id = int(request.state.user["sub"])
+    terms = tokenize(q)[:MAX_QUERY_TERMS]
+    if not terms:
+        return json_response([])
+
+    categories = await category_cache.get()
+    archive = await archive_catalog.load()
+    filters = (sdate, edate, category, min_amount, max_amount)
+    accept = filter_predicate(*filters)
+
+    if engine.dialect.name == "mysql":
+        score = match(
+            Expense.description, against=" ".join(f"+{term}*" for term in terms)
+        ).in_boolean_mode()
+        query = (
+            select(*SEARCH_COLUMNS, score.label("score"))
+            .where(
+                Expense.user_id == user_id,
+                score,
+                *filter_conditions(*filters),
+                *archive.hot_conditions(),
+            )
+            .order_by(score.desc(), Expense.id.desc())
+            .limit(limit)
+        )
+        rows = [row._mapping for row in await db.execute(query)]
+        # FULLTEXT scores and BM25 ones do not compare, so archived matches
+        # fill the page after the hot ones
+        if len(rows) < limit and archive.covers(date_bounds(sdate, edate)[0]):
+            index = await search_index.get(db, user_id, archive, hot=False)
+            rows += [
+                {**index.archived[id], "score": score}
+                for score, id in index.search(terms, accept, limit - len(rows))
+            ]
+    else:
+        index = await search_index.get(db, user_id, archive)
+        ranked = index.search(terms, accept, limit)
+        found = {id: index.archived[id] for _, id in ranked if id in index.archived}
+        ids = [id for _, id in ranked if id not in found]
+        if ids:
+            result = await db.execute(
+                select(*SEARCH_COLUMNS).where(Expense.id.in_(ids))
+            )
+            found.update((row.id, row._mapping) for row in result)
+        rows = [{**found[id], "score": score} for score, id in ranked if id in found]
+
+    categories = await category_cache.covering(
+        categories, {row["category_id"] for row in rows}
+    )
+    data = search_serializer.rows(
+        {**row, "name": categories.names.get(row["category_id"])} for row in rows
+    )
+    return json_response(data)
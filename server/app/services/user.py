@@ -1,8 +1,21 @@
-from fastapi import APIRouter, Depends, status, Request, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
+from ..core.sessions import (
+    ACCESS_LIFETIME,
+    REFRESH_LIFETIME,
+    create_session,
+    revoke_session,
+    revoked_sessions,
+    rotate_session,
+)
 from ..models.user import User
-from ..utils.password import get_password_hash, verify_password
+from ..utils.password import (
+    PasswordPoolBusy,
+    hash_password_async,
+    verify_and_update_async,
+)
 from ..schemas.user import (
     UserCreate,
     UserResponse,
@@ -16,10 +29,25 @@ from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
+# Cookies live exactly as long as the tokens they carry
+ACCESS_COOKIE_MAX_AGE = int(ACCESS_LIFETIME.total_seconds())
+REFRESH_COOKIE_MAX_AGE = int(REFRESH_LIFETIME.total_seconds())
+
+
+def password_pool_busy_response():
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+            "message": "Server busy, please try again",
+        },
+        headers={"Retry-After": "1"},
+    )
+
 
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
 
     if existing_user:
         return JSONResponse(
@@ -39,13 +67,16 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             },
         )
 
-    password_hash = get_password_hash(user.password)
+    try:
+        password_hash = await hash_password_async(user.password)
+    except PasswordPoolBusy:
+        return password_pool_busy_response()
 
     new_user = User(name=user.name, email=user.email, password=password_hash)
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     data = UserDataResponse.model_validate(new_user)
 
@@ -60,11 +91,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(user: LoginRequest, db: Session = Depends(get_db)):
+async def login(user: LoginRequest, db: AsyncSession = Depends(get_db)):
     email = user.email
     password = user.password
 
-    check_user = db.query(User).filter(User.email == email).first()
+    check_user = await db.scalar(select(User).where(User.email == email))
 
     if not check_user:
         return JSONResponse(
@@ -75,7 +106,12 @@ def login(user: LoginRequest, db: Session = Depends(get_db)):
             },
         )
 
-    match_password = verify_password(password, check_user.password)
+    try:
+        match_password, new_hash = await verify_and_update_async(
+            password, check_user.password
+        )
+    except PasswordPoolBusy:
+        return password_pool_busy_response()
 
     if not match_password:
         return JSONResponse(
@@ -86,13 +122,19 @@ def login(user: LoginRequest, db: Session = Depends(get_db)):
             },
         )
 
+    if new_hash:
+        check_user.password = new_hash
+
     db_id = str(check_user.id)
     db_name = check_user.name
-    access_token = create_access_token({"sub": db_id})
-    refresh_token = create_refresh_token({"sub": db_id})
+    session_id, jti = create_session(db, check_user.id)
+    await db.commit()
 
-    # check_user.refresh_token = refresh_token
-    db.commit()
+    access_token = create_access_token({"sub": db_id, "sid": session_id})
+    # name/email ride along so /refresh can answer without reading the user
+    refresh_token = create_refresh_token(
+        {"sub": db_id, "sid": session_id, "jti": jti, "name": db_name, "email": email}
+    )
 
     data = {"name": db_name, "email": email}
 
@@ -105,19 +147,19 @@ def login(user: LoginRequest, db: Session = Depends(get_db)):
         },
     )
 
-    set_cookie(response, "accessToken", access_token, max_age=60 * 60)
+    set_cookie(response, "accessToken", access_token, max_age=ACCESS_COOKIE_MAX_AGE)
     set_cookie(
         response,
         "refreshToken",
         refresh_token,
-        max_age=7 * 24 * 60 * 60,
+        max_age=REFRESH_COOKIE_MAX_AGE,
         path="/",
     )
     return response
 
 
 @router.get("/refresh", response_model=LoginResponse)
-def refresh_token(request: Request, response: Response, db: Session = Depends(get_db)):
+async def refresh_token(request: Request, db: AsyncSession = Depends(get_db)):
     refresh_token = get_cookie(request, "refreshToken")
     if not refresh_token:
         return JSONResponse(
@@ -129,51 +171,59 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
         )
 
     payload = verify_token(refresh_token, is_refresh=True)
-    if not payload:
-        delete_cookie(response, "refreshToken", path="/")
-        return JSONResponse(
+    session_id = payload.get("sid") if payload else None
+    new_jti = None
+    if session_id and session_id not in revoked_sessions:
+        new_jti = await rotate_session(db, session_id, payload.get("jti"))
+        await db.commit()
+
+    if not new_jti:
+        response = JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={
                 "status": status.HTTP_401_UNAUTHORIZED,
                 "message": "UNAUTHORIZED __002",
             },
         )
+        delete_cookie(response, "refreshToken", path="/")
+        return response
 
-    id = payload["sub"]
-    check_user = db.query(User).filter(User.id == int(id)).first()
-    data = {"name": check_user.name, "email": check_user.email}
+    claims = {key: payload.get(key) for key in ("sub", "sid", "name", "email")}
+    new_access_token = create_access_token({"sub": claims["sub"], "sid": session_id})
+    new_refresh_token = create_refresh_token({**claims, "jti": new_jti})
 
-    new_access_token = create_access_token({"sub": str(payload["sub"])})
-    set_cookie(response, "accessToken", new_access_token, max_age=60 * 60)
-    return JSONResponse(
+    response = JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "status": status.HTTP_200_OK,
             "message": "Access token refreshed",
-            "data": data,
+            "data": {"name": claims["name"], "email": claims["email"]},
         },
     )
+    set_cookie(response, "accessToken", new_access_token, max_age=ACCESS_COOKIE_MAX_AGE)
+    set_cookie(
+        response,
+        "refreshToken",
+        new_refresh_token,
+        max_age=REFRESH_COOKIE_MAX_AGE,
+        path="/",
+    )
+    return response
 
 
 @router.post("/logout")
-def logout(request: Request, response: Response, db: Session = Depends(get_db)):
+async def logout(request: Request, db: AsyncSession = Depends(get_db)):
     refresh_token = request.cookies.get("refreshToken")
+    payload = verify_token(refresh_token, is_refresh=True) if refresh_token else None
 
-    if refresh_token:
-        try:
-            payload = verify_token(refresh_token)
-            user_id = payload.get("sub")
-
-            if user_id:
-                user = db.query(User).filter(User.id == user_id).first()
-                if user:
-                    user.refresh_token = None
-                    db.commit()
-        except Exception:
-            pass
-    delete_cookie(response, "refreshToken", path="/refresh")
-    delete_cookie(response, "accessToken")
-    return JSONResponse(
+    if payload and payload.get("sid"):
+        await revoke_session(db, payload["sid"])
+        await db.commit()
+
+    response = JSONResponse(
         status_code=status.HTTP_200_OK,
         content={"status": status.HTTP_200_OK, "message": "Logout successfully"},
     )
+    delete_cookie(response, "refreshToken", path="/")
+    delete_cookie(response, "accessToken")
+    return response
@@ -0,0 +1,243 @@
+from datetime import date, datetime, time, timedelta
+import os
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from ..models.archive import ExpenseArchive
+from ..models.expense import Expense
+from .clock import utcnow
+from .pagination import after_cursor
+
+ARCHIVE_COLUMNS = (
+    "id",
+    "user_id",
+    "category_id",
+    "amount",
+    "description",
+    "created_at",
+    "updated_at",
+)
+ARCHIVE_BATCH_SIZE = 50000
+# Rows are sorted by user, so the row group statistics let a reader skip
+# every group that holds no rows for the user it is looking for
+ARCHIVE_ROW_GROUP_SIZE = 10000
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date):
+    start = datetime.combine(month, time.min)
+    return start, datetime.combine(add_months(month, 1), time.min)
+
+
+def hot_boundary(db: Session):
+    """Start of the data still served from expense, or None with no archive."""
+    latest = db.scalar(select(func.max(ExpenseArchive.month)))
+    return month_bounds(latest)[1] if latest is not None else None
+
+
+def archive_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("category_id", pa.int64()),
+            ("amount", pa.int64()),
+            ("description", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def write_month(db: Session, month: date, path: str) -> int:
+    """Writes one month of expenses to a zstd-compressed Parquet file,
+    sorted by (user_id, created_at, id); returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start, end = month_bounds(month)
+    query = (
+        select(*(getattr(Expense, name) for name in ARCHIVE_COLUMNS))
+        .where(Expense.created_at >= start, Expense.created_at < end)
+        .order_by(Expense.user_id, Expense.created_at, Expense.id)
+        .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+    )
+
+    schema = archive_schema()
+    partial = path + ".partial"
+    count = 0
+    with pq.ParquetWriter(partial, schema, compression="zstd") as writer:
+        for rows in db.execute(query).partitions():
+            columns = {
+                name: [row._mapping[name] for row in rows] for name in ARCHIVE_COLUMNS
+            }
+            writer.write_table(
+                pa.Table.from_pydict(columns, schema=schema),
+                row_group_size=ARCHIVE_ROW_GROUP_SIZE,
+            )
+            count += len(rows)
+    # Readers only ever see complete files
+    os.replace(partial, path)
+    return count
+
+
+def _may_hold(statistics, low, high) -> bool:
+    # Row groups without min/max statistics have to be read
+    if statistics is None or not statistics.has_min_max:
+        return True
+    return (low is None or statistics.max >= low) and (
+        high is None or statistics.min <= high
+    )
+
+
+def read_month(path: str, user_id: int, columns=None, ranges: dict = None):
+    """The user's rows of one archived month as a pyarrow Table, in file
+    order (created_at, id).
+
+    Only the row groups whose statistics allow the user, and every
+    {column: (low, high)} in ranges (inclusive, None for open), are read.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    bounds = {"user_id": (user_id, user_id), **(ranges or {})}
+    with pq.ParquetFile(path) as parquet:
+        names = parquet.schema_arrow.names
+        groups = []
+        for index in range(parquet.metadata.num_row_groups):
+            group = parquet.metadata.row_group(index)
+            if all(
+                _may_hold(group.column(names.index(name)).statistics, low, high)
+                for name, (low, high) in bounds.items()
+            ):
+                groups.append(index)
+        wanted = None if columns is None else list(dict.fromkeys(("user_id", *columns)))
+        table = parquet.read_row_groups(groups, columns=wanted)
+    return table.filter(pc.equal(table["user_id"], user_id))
+
+
+def select_month(
+    path: str,
+    user_id: int,
+    accept=None,
+    key: str = "created_at",
+    descending: bool = True,
+    position: tuple = None,
+    limit: int = None,
+    columns=None,
+):
+    """The user's rows of one archived month that pass accept, sorted by
+    (key, id), after position and cut to limit.
+
+    Returns (table, matched, amount); matched and amount cover every row
+    accept took, before the cursor and limit are applied, so a first page
+    gets its totals from the same read.
+    """
+    import pyarrow as pa
+
+    ranges = None
+    if position is not None and key != "created_at":
+        # The sort column's statistics rule out row groups before the cursor
+        value = position[0]
+        ranges = {key: (None, value) if descending else (value, None)}
+    needed = ("id", "created_at", "category_id", "amount")
+    table = read_month(
+        path, user_id, None if columns is None else (*needed, *columns), ranges
+    )
+
+    amounts = table["amount"].to_pylist()
+    if accept is None:
+        keep = [True] * table.num_rows
+    else:
+        keep = [
+            accept(created_at, category_id, amount)
+            for created_at, category_id, amount in zip(
+                table["created_at"].to_pylist(),
+                table["category_id"].to_pylist(),
+                amounts,
+            )
+        ]
+    matched = sum(keep)
+    amount = sum(value for value, kept in zip(amounts, keep) if kept)
+
+    if position is not None:
+        keep = [
+            kept and after_cursor((value, id), position, descending)
+            for kept, value, id in zip(
+                keep, table[key].to_pylist(), table["id"].to_pylist()
+            )
+        ]
+    order = "descending" if descending else "ascending"
+    table = table.filter(pa.array(keep, pa.bool_())).sort_by(
+        [(key, order), ("id", order)]
+    )
+    if limit is not None:
+        table = table.slice(0, limit)
+    if columns is not None:
+        table = table.select(list(dict.fromkeys(columns)))
+    return table, matched, amount
+
+
+def archive_expenses(
+    db: Session, archive_dir: str, older_than_months: int, purge_delay: float
+):
+    """Moves every month older than older_than_months to archive_dir.
+
+    A month is archived in two steps so no reader ever misses rows. First its
+    Parquet file and manifest row are written, and readers switch to the
+    file once their cached manifest expires. On a later run, once the
+    manifest is at least purge_delay seconds old, the month's rows are
+    deleted from expense. Rollup tables are left alone, so totals still
+    cover archived months. Returns the (archived, purged) months.
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    os.makedirs(archive_dir, exist_ok=True)
+    archived_now, purged_now = [], []
+    now = utcnow()
+    cutoff = add_months(month_start(now), -older_than_months)
+    archived = {entry.month: entry for entry in db.scalars(select(ExpenseArchive))}
+
+    oldest = db.scalar(
+        select(func.min(Expense.created_at)).where(
+            Expense.created_at < datetime.combine(cutoff, time.min)
+        )
+    )
+    month = month_start(oldest) if oldest is not None else cutoff
+    while month < cutoff:
+        if month not in archived:
+            path = os.path.join(archive_dir, f"expense-{month:%Y-%m}.parquet")
+            count = write_month(db, month, path)
+            if count:
+                entry = ExpenseArchive(
+                    month=month, path=path, row_count=count, archived_at=now
+                )
+                db.add(entry)
+                db.commit()
+                archived[month] = entry
+                archived_now.append(month)
+            else:
+                os.remove(path)
+        month = add_months(month, 1)
+
+    purge_before = now - timedelta(seconds=purge_delay)
+    for entry in sorted(archived.values(), key=lambda entry: entry.month):
+        if entry.purged_at is None and entry.archived_at <= purge_before:
+            start, end = month_bounds(entry.month)
+            db.execute(
+                delete(Expense).where(
+                    Expense.created_at >= start, Expense.created_at < end
+                )
+            )
+            entry.purged_at = utcnow()
+            db.commit()
+            purged_now.append(entry.month)
+    return archived_now, purged_now
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    # Naive UTC, comparable with the DATETIME columns on every backend
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,115 @@
+import csv
+import io
+import zlib
+
+EXPORT_BATCH_SIZE = 5000
+EXPORT_COLUMNS = ("id", "created_at", "category", "amount", "description")
+
+
+class CsvWriter:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def write(self, rows: list) -> bytes:
+        self._writer.writerows(
+            (
+                row["id"],
+                row["created_at"].isoformat() if row["created_at"] else "",
+                row["category"],
+                row["amount"],
+                row["description"],
+            )
+            for row in rows
+        )
+        return self._take()
+
+    def close(self) -> bytes:
+        return self._take()
+
+
+class _ChunkSink(io.RawIOBase):
+    # Parquet footers record absolute offsets, so tell() has to keep counting
+    # after written bytes have been handed to the response
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetWriter:
+    """One row group per batch; needs the optional pyarrow dependency."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("id", pa.int64()),
+                ("created_at", pa.timestamp("us")),
+                ("category", pa.string()),
+                ("amount", pa.int64()),
+                ("description", pa.string()),
+            ]
+        )
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema)
+
+    def write(self, rows: list) -> bytes:
+        columns = {name: [row[name] for row in rows] for name in EXPORT_COLUMNS}
+        self._writer.write_table(
+            self._pa.Table.from_pydict(columns, schema=self._schema)
+        )
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+class GzipWriter:
+    """Compresses another writer's output as one continuous gzip stream."""
+
+    def __init__(self, writer):
+        self._writer = writer
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def write(self, rows: list) -> bytes:
+        return self._compressor.compress(self._writer.write(rows))
+
+    def close(self) -> bytes:
+        data = self._compressor.compress(self._writer.close())
+        return data + self._compressor.flush()
+
+
+EXPORT_WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter}
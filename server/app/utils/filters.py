@@ -0,0 +1,88 @@
+from datetime import date, datetime, time, timedelta
+from typing import List
+from ..models.expense import Expense
+
+
+def date_bounds(sdate: date, edate: date):
+    # Inclusive days as a half-open [start, end) timestamp range
+    start = datetime.combine(sdate, time.min) if sdate is not None else None
+    end = (
+        datetime.combine(edate + timedelta(days=1), time.min)
+        if edate is not None
+        else None
+    )
+    return start, end
+
+
+def filter_conditions(
+    sdate: date = None,
+    edate: date = None,
+    categories: List[int] = None,
+    min_amount: int = None,
+    max_amount: int = None,
+) -> list:
+    """WHERE clauses for the expense filters shared by /filter, /export and
+    /search. Comparisons are on the raw columns, which keeps the
+    (user_id, created_at) index usable."""
+    start, end = date_bounds(sdate, edate)
+    conditions = []
+    if start is not None:
+        conditions.append(Expense.created_at >= start)
+    if end is not None:
+        conditions.append(Expense.created_at < end)
+    if categories:
+        conditions.append(Expense.category_id.in_(categories))
+    if min_amount is not None:
+        conditions.append(Expense.amount >= min_amount)
+    if max_amount is not None:
+        conditions.append(Expense.amount <= max_amount)
+    return conditions
+
+
+def filter_predicate(
+    sdate: date = None,
+    edate: date = None,
+    categories: List[int] = None,
+    min_amount: int = None,
+    max_amount: int = None,
+):
+    """The same filters as filter_conditions, applied in Python to
+    (created_at, category_id, amount)."""
+    start, end = date_bounds(sdate, edate)
+    wanted = set(categories) if categories else None
+
+    def accept(created_at, category_id, amount) -> bool:
+        if start is not None and (created_at is None or created_at < start):
+            return False
+        if end is not None and (created_at is None or created_at >= end):
+            return False
+        if wanted is not None and category_id not in wanted:
+            return False
+        if min_amount is not None and amount < min_amount:
+            return False
+        if max_amount is not None and amount > max_amount:
+            return False
+        return True
+
+    return accept
+
+
+def excluding_categories(categories: List[int]):
+    """A filter_predicate-style accept() that drops the given categories."""
+    excluded = set(categories)
+
+    def accept(created_at, category_id, amount) -> bool:
+        return category_id not in excluded
+
+    return accept
+
+
+def including_categories(categories: List[int]):
+    """A filter_predicate-style accept() that keeps only the given
+    categories, none if the list is empty."""
+    included = set(categories)
+
+    def accept(created_at, category_id, amount) -> bool:
+        return category_id in included
+
+    return accept
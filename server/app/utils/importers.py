@@ -0,0 +1,86 @@
+import codecs
+import csv
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<\r\n]*)")
+OFX_DATETIME = re.compile(
+    r"(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?$"
+)
+
+
+def _text_lines(file, encoding="utf-8-sig"):
+    # Decode the upload incrementally instead of reading it into memory
+    reader = codecs.getreader(encoding)(file, errors="replace")
+    for line in reader:
+        yield line
+
+
+def iter_csv_rows(file):
+    """Yield one dict per CSV line; expects category_id, amount, description
+    and optionally created_at (ISO 8601, UTC unless it carries an offset)."""
+    for row in csv.DictReader(_text_lines(file)):
+        yield row
+
+
+def iter_ofx_rows(file):
+    """Yield one dict per <STMTTRN> block of an OFX (SGML or XML) statement."""
+    transaction = None
+    for line in _text_lines(file, encoding="latin-1"):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and transaction is not None:
+                    yield _ofx_transaction(transaction)
+                transaction = None if closing else {}
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+
+
+def parse_ofx_datetime(value: str):
+    """DTPOSTED (YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]]) as naive UTC; OFX times
+    without an offset are GMT. Returns None when value is not an OFX date."""
+    match = OFX_DATETIME.match(value or "")
+    if not match:
+        return None
+    day, clock, offset = match.groups()
+    try:
+        posted = datetime.strptime(day + (clock or "000000"), "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    if offset:
+        posted -= timedelta(hours=float(offset))
+    return posted
+
+
+def _ofx_amount(value: str):
+    """TRNAMT as a positive amount and whether it is a credit (money in).
+
+    Whole amounts become ints; anything else is passed on unchanged so row
+    validation reports it instead of the importer rounding it away."""
+    try:
+        amount = Decimal(value)
+    except (TypeError, InvalidOperation):
+        return value, False
+    credit = amount > 0
+    amount = abs(amount)
+    if amount != amount.to_integral_value():
+        return amount, credit
+    return int(amount), credit
+
+
+def _ofx_transaction(transaction: dict):
+    amount, credit = _ofx_amount(transaction.get("TRNAMT"))
+    posted = transaction.get("DTPOSTED")
+    description = " ".join(
+        part for part in (transaction.get("NAME"), transaction.get("MEMO")) if part
+    )
+    return {
+        "amount": amount,
+        "description": description,
+        # Unparseable dates are left as they are for validation to reject
+        "created_at": parse_ofx_datetime(posted) or posted,
+        # Credits go to the income category
+        "credit": credit,
+    }
@@ -0,0 +1,43 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(value, id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = f"{value}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, parse=datetime.fromisoformat):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, id = raw.rsplit("|", 1)
+        return parse(value), int(id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_filter(sort_col, id_col, cursor: tuple, descending: bool = True):
+    # Rows strictly after the cursor in (sort_col, id) order
+    value, id = cursor
+    if descending:
+        return or_(sort_col < value, and_(sort_col == value, id_col < id))
+    return or_(sort_col > value, and_(sort_col == value, id_col > id))
+
+
+def after_cursor(position: tuple, cursor: tuple, descending: bool = True) -> bool:
+    # keyset_filter for a (value, id) pair already in memory
+    return position < cursor if descending else position > cursor
+
+
+def next_cursor(rows: list, limit: int, key: str = "created_at"):
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(getattr(last, key), last.id)
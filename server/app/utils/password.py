@@ -1,6 +1,25 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+from ..core.config import get_settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+settings = get_settings()
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
+
+_executor = None
+_pending = 0
+
+
+class PasswordPoolBusy(Exception):
+    pass
 
 
 def get_password_hash(password: str) -> str:
@@ -9,3 +28,47 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    # Returns (valid, new_hash); new_hash is set when the stored hash uses
+    # outdated Argon2 parameters and should be replaced
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.password_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _submit(fn, *args):
+    global _pending
+    if _pending >= settings.password_max_pending:
+        raise PasswordPoolBusy()
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit(get_password_hash, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str):
+    return await _submit(verify_and_update, plain_password, hashed_password)
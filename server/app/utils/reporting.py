@@ -0,0 +1,169 @@
+from datetime import date
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+MAX_REPORT_DAYS = 3660
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day_array(days) -> np.ndarray:
+    if isinstance(days, np.ndarray):
+        return days.astype("datetime64[D]")
+    # numpy converts date objects one by one on a slow path, about 20x the
+    # cost of going through their ordinals; the date strings SQLite's DATE()
+    # returns parse quickly as they are
+    try:
+        ordinals = np.fromiter(map(date.toordinal, days), np.int64, len(days))
+    except TypeError:
+        return np.asarray(days, dtype="datetime64[D]")
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    # Trailing mean; the first window - 1 days average over what is available
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    return (sums[upper] - sums[lower]) / (upper - lower)
+
+
+def _sum_by(index: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    return np.bincount(index, weights=weights, minlength=size).astype(np.float64)
+
+
+def _deltas(values: np.ndarray):
+    previous = np.concatenate(([np.nan], values[:-1]))
+    delta = values - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(previous > 0, delta / previous * 100, np.nan)
+    return delta, ratio
+
+
+def _nullable(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else round(value, 2) for value in values.tolist()]
+
+
+def build_report(
+    days,
+    category_ids,
+    amounts,
+    start: date,
+    end: date,
+    income_ids,
+    names: dict,
+    window: int,
+) -> dict:
+    """Yearly statement figures for one user's expenses in [start, end).
+
+    days, category_ids and amounts are parallel columns, one entry per
+    expense. Everything is computed with array operations over dense daily
+    and monthly axes, so the cost is a few passes over the columns.
+    """
+    days = _day_array(days)
+    category_ids = np.asarray(category_ids, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    is_income = np.isin(category_ids, list(income_ids))
+    is_spend = ~is_income
+
+    first_day = np.datetime64(start, "D")
+    day_axis = np.arange(first_day, np.datetime64(end, "D"))
+    day_index = (days - first_day).astype(np.int64)
+    daily_income = _sum_by(day_index[is_income], amounts[is_income], len(day_axis))
+    daily_spend = _sum_by(day_index[is_spend], amounts[is_spend], len(day_axis))
+    balance = np.cumsum(daily_income - daily_spend)
+    spend_average = _moving_average(daily_spend, window)
+
+    first_month = first_day.astype("datetime64[M]")
+    month_axis = np.arange(
+        first_month, day_axis[-1].astype("datetime64[M]") + np.timedelta64(1, "M")
+    )
+    month_index = (days.astype("datetime64[M]") - first_month).astype(np.int64)
+    monthly_income = _sum_by(
+        month_index[is_income], amounts[is_income], len(month_axis)
+    )
+    monthly_spend = _sum_by(month_index[is_spend], amounts[is_spend], len(month_axis))
+    spend_delta, spend_delta_pct = _deltas(monthly_spend)
+
+    category_axis, category_index = np.unique(category_ids, return_inverse=True)
+    category_totals = np.bincount(category_index, weights=amounts)
+    category_counts = np.bincount(category_index)
+    order = np.argsort(-category_totals, kind="stable")
+
+    income_total = float(daily_income.sum())
+    spend_total = float(daily_spend.sum())
+    spend_amounts = amounts[is_spend]
+    if len(spend_amounts):
+        percentiles = np.percentile(spend_amounts, PERCENTILES).tolist()
+        mean = float(spend_amounts.mean())
+        largest = float(spend_amounts.max())
+    else:
+        percentiles = [None] * len(PERCENTILES)
+        mean = largest = None
+
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "income": income_total,
+            "spend": spend_total,
+            "net": income_total - spend_total,
+            "count": int(len(amounts)),
+        },
+        "percentiles": {
+            **{f"p{p}": value for p, value in zip(PERCENTILES, percentiles)},
+            "mean": mean,
+            "max": largest,
+        },
+        "categories": [
+            {
+                "category_id": category_id,
+                "name": names.get(category_id),
+                "income": category_id in income_ids,
+                "total": total,
+                "count": count,
+                "share": (
+                    round(total / spend_total * 100, 2)
+                    if spend_total and category_id not in income_ids
+                    else None
+                ),
+            }
+            for category_id, total, count in zip(
+                category_axis[order].tolist(),
+                category_totals[order].tolist(),
+                category_counts[order].tolist(),
+            )
+        ],
+        "monthly": [
+            {
+                "month": month,
+                "income": income,
+                "spend": spend,
+                "net": income - spend,
+                "spend_delta": delta,
+                "spend_delta_pct": pct,
+            }
+            for month, income, spend, delta, pct in zip(
+                np.datetime_as_string(month_axis.astype("datetime64[D]")).tolist(),
+                monthly_income.tolist(),
+                monthly_spend.tolist(),
+                _nullable(spend_delta),
+                _nullable(spend_delta_pct),
+            )
+        ],
+        "daily": [
+            {
+                "date": day,
+                "income": income,
+                "spend": spend,
+                "balance": running,
+                "spend_avg": round(average, 2),
+            }
+            for day, income, spend, running, average in zip(
+                np.datetime_as_string(day_axis).tolist(),
+                daily_income.tolist(),
+                daily_spend.tolist(),
+                balance.tolist(),
+                spend_average.tolist(),
+            )
+        ],
+    }
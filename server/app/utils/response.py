@@ -0,0 +1,87 @@
+from datetime import date, datetime
+from typing import Optional, get_args, get_origin, Union
+from fastapi import Response, status
+import orjson
+import time
+from ..core.instrumentation import record_serialization
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(value)
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _converter(annotation):
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else annotation
+
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is float:
+        return _to_float
+    return None
+
+
+class RowSerializer:
+    """Maps SQLAlchemy rows straight to JSON-ready dicts for a response schema.
+
+    The per-field conversions are worked out once from the Pydantic model, so
+    each row only pays for a dict build instead of model validation + dump.
+    The output matches schema.model_validate(row).model_dump(mode="json").
+    """
+
+    def __init__(self, schema):
+        self.fields = tuple(
+            (name, _converter(field.annotation))
+            for name, field in schema.model_fields.items()
+        )
+
+    def row(self, row) -> dict:
+        mapping = row if isinstance(row, dict) else row._mapping
+        return {
+            name: convert(mapping[name]) if convert else mapping[name]
+            for name, convert in self.fields
+        }
+
+    def rows(self, rows) -> list:
+        start = time.perf_counter()
+        data = [self.row(row) for row in rows]
+        record_serialization(time.perf_counter() - start)
+        return data
+
+
+def dumps(content) -> bytes:
+    start = time.perf_counter()
+    body = orjson.dumps(content, option=JSON_OPTIONS)
+    record_serialization(time.perf_counter() - start)
+    return body
+
+
+def json_response(
+    data=None,
+    message: str = "Ok",
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None,
+    **extra,
+) -> Response:
+    content = {"status": status_code, "message": message}
+    if data is not None:
+        content["data"] = data
+    content.update(extra)
+
+    return Response(
+        content=dumps(content),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,89 @@
+from datetime import datetime
+from sqlalchemy import func, delete, select, insert
+from sqlalchemy.orm import Session
+from ..models.expense import Expense
+from ..models.rollup import DailyTotal, CategoryTotal
+
+
+def _upsert(db: Session, model, keys: dict, column: str, amount):
+    values = {**keys, column: amount}
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(model).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            {column: getattr(model, column) + stmt.inserted[column]}
+        )
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(model).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: getattr(model, column) + stmt.excluded[column]},
+        )
+
+    db.execute(stmt)
+
+
+def apply_expense(db: Session, user_id: int, category_id: int, amount: int, day):
+    # Runs inside the caller's transaction so the rollups commit with the
+    # expense. day is the UTC date of the expense's created_at
+    _upsert(
+        db,
+        DailyTotal,
+        {"user_id": user_id, "day": day, "category_id": category_id},
+        "amount",
+        amount,
+    )
+    _upsert(
+        db,
+        CategoryTotal,
+        {"user_id": user_id, "category_id": category_id},
+        "total",
+        amount,
+    )
+
+
+def rebuild(db: Session, user_id: int = None, since: datetime = None):
+    """Recomputes the rollups from expense. Days before since (the start of
+    the hot data once months are archived) keep their existing rows, and
+    the category totals are summed from the daily rows so they still
+    include archived months."""
+    daily = select(
+        Expense.user_id,
+        func.date(Expense.created_at),
+        Expense.category_id,
+        func.sum(Expense.amount),
+    ).group_by(Expense.user_id, func.date(Expense.created_at), Expense.category_id)
+    category = select(
+        DailyTotal.user_id, DailyTotal.category_id, func.sum(DailyTotal.amount)
+    ).group_by(DailyTotal.user_id, DailyTotal.category_id)
+
+    clear_daily = delete(DailyTotal)
+    clear_category = delete(CategoryTotal)
+
+    if user_id is not None:
+        daily = daily.where(Expense.user_id == user_id)
+        category = category.where(DailyTotal.user_id == user_id)
+        clear_daily = clear_daily.where(DailyTotal.user_id == user_id)
+        clear_category = clear_category.where(CategoryTotal.user_id == user_id)
+    if since is not None:
+        daily = daily.where(Expense.created_at >= since)
+        clear_daily = clear_daily.where(DailyTotal.day >= since.date())
+
+    db.execute(clear_daily)
+    db.execute(clear_category)
+    db.execute(
+        insert(DailyTotal).from_select(
+            ["user_id", "day", "category_id", "amount"], daily
+        )
+    )
+    db.execute(
+        insert(CategoryTotal).from_select(["user_id", "category_id", "total"], category)
+    )
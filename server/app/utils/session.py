@@ -1,10 +1,7 @@
 from fastapi import Response, Request
-from dotenv import load_dotenv
-import os
+from ..core.config import get_settings
 
-load_dotenv()
-
-APP_ENV = os.getenv("APP_ENV")
+settings = get_settings()
 
 
 def set_cookie(response: Response, key: str, token: str, max_age: int, path: str = "/"):
@@ -13,7 +10,7 @@ def set_cookie(response: Response, key: str, token: str, max_age: int, path: str
         value=token,
         httponly=True,
         secure=True,
-        samesite="None" if APP_ENV == "DEVELOPMENT" else "lax",
+        samesite="None" if settings.app_env == "DEVELOPMENT" else "lax",
         max_age=max_age,
         path=path,
     )
@@ -0,0 +1,144 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Date, cast, func
+
+BUCKETS = ("day", "week", "month", "year")
+MAX_BUCKETS = 1000
+UTC_ZONES = ("UTC", "Etc/UTC", "Etc/GMT", "GMT", "Zulu")
+
+# How far back the range reaches when the caller gives no start date
+DEFAULT_SPAN = {"day": 31, "week": 12, "month": 12, "year": 10}
+
+
+def get_timezone(name: str):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def is_utc(tz) -> bool:
+    return tz.key in UTC_ZONES
+
+
+def local_today(tz) -> date:
+    return datetime.now(tz).date()
+
+
+def to_utc(day: date, tz) -> datetime:
+    # Naive UTC, matching how created_at is stored
+    local = datetime.combine(day, time(), tzinfo=tz)
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_floor(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def default_start(end: date, bucket: str) -> date:
+    span = DEFAULT_SPAN[bucket]
+    last = bucket_floor(end - timedelta(days=1), bucket)
+
+    if bucket == "day":
+        return last - timedelta(days=span - 1)
+    if bucket == "week":
+        return last - timedelta(weeks=span - 1)
+    if bucket == "month":
+        months = last.year * 12 + last.month - span
+        return date(months // 12, months % 12 + 1, 1)
+    return date(last.year - span + 1, 1, 1)
+
+
+def bucket_count(start: date, end: date, bucket: str) -> int:
+    # Upper bound on the number of buckets in the half-open range [start, end)
+    last = end - timedelta(days=1)
+    if bucket == "day":
+        return (end - start).days
+    if bucket == "week":
+        return (bucket_floor(last, "week") - bucket_floor(start, "week")).days // 7 + 1
+    if bucket == "month":
+        return (last.year - start.year) * 12 + last.month - start.month + 1
+    return last.year - start.year + 1
+
+
+def bucket_start(column, bucket: str, dialect: str):
+    """SQL expression for the first day of the bucket containing column."""
+    if dialect == "mysql":
+        if bucket == "week":
+            return func.subdate(func.date(column), func.weekday(column))
+        if bucket == "month":
+            return cast(func.date_format(column, "%Y-%m-01"), Date)
+        if bucket == "year":
+            return cast(func.date_format(column, "%Y-01-01"), Date)
+        return func.date(column)
+
+    if dialect == "postgresql":
+        return cast(func.date_trunc(bucket, column), Date)
+
+    if bucket == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.date(column, "start of month")
+    if bucket == "year":
+        return func.date(column, "start of year")
+    return func.date(column)
+
+
+# Dialects that can convert time zones in SQL; elsewhere rows are bucketed
+# in Python by local_buckets
+TZ_DIALECTS = ("mysql", "postgresql")
+
+
+def in_timezone(column, name: str, dialect: str):
+    """Shift a naive UTC timestamp column to local time in the named zone."""
+    if dialect == "mysql":
+        # Named zones need the MySQL time zone tables to be loaded
+        return func.convert_tz(column, "+00:00", name)
+    return func.timezone(name, func.timezone("UTC", column))
+
+
+def local_day(created_at: datetime, tz) -> date:
+    return created_at.replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+
+def local_buckets(rows, tz, bucket: str, by_category: bool = False) -> list:
+    """Sums (created_at, category_id, amount) rows into local-time buckets.
+
+    Each row is converted with its own UTC offset, so buckets stay right
+    across DST changes. Returns (bucket, category_id, amount) tuples in
+    bucket order; category_id is None unless by_category is set.
+    """
+    totals = {}
+    for created_at, category_id, amount in rows:
+        key = (
+            bucket_floor(local_day(created_at, tz), bucket),
+            category_id if by_category else None,
+        )
+        totals[key] = totals.get(key, 0) + amount
+    return _sorted_buckets(totals)
+
+
+def combine_buckets(*parts) -> list:
+    """Adds up lists of (bucket, category_id, amount) tuples, such as grouped
+    SQL rows and local_buckets() output, in bucket order."""
+    totals = {}
+    for rows in parts:
+        for period, category_id, amount in rows:
+            key = (period, category_id)
+            totals[key] = totals.get(key, 0) + amount
+    return _sorted_buckets(totals)
+
+
+def _sorted_buckets(totals: dict) -> list:
+    return [
+        (period, category_id, amount)
+        for (period, category_id), amount in sorted(
+            totals.items(), key=lambda item: (item[0][0], item[0][1] or 0)
+        )
+    ]
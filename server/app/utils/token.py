@@ -1,34 +1,58 @@
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-import os
+import hashlib
+from .cache import TTLCache
+from ..core.config import get_settings
 
-ACCESS_SECRET_KEY = os.getenv("ACCESS_SECRET_KEY")
-REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
-REFRESH_TOKEN_EXPIRE_DAYS = os.getenv("REFRESH_TOKEN_EXPIRE_DAYS")
+settings = get_settings()
+
+# Verified payloads keyed by token digest, evicted no later than the token's exp
+access_token_cache = TTLCache(maxsize=settings.token_cache_size)
+refresh_token_cache = TTLCache(maxsize=settings.token_cache_size)
 
 
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(
-        minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES)
+        minutes=settings.access_token_expire_minutes
     )
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, ACCESS_SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(
+        to_encode, settings.access_secret_key, algorithm=settings.algorithm
+    )
 
 
 def create_refresh_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=int(REFRESH_TOKEN_EXPIRE_DAYS))
+    expire = datetime.now(timezone.utc) + timedelta(
+        days=settings.refresh_token_expire_days
+    )
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(
+        to_encode, settings.refresh_secret_key, algorithm=settings.algorithm
+    )
+
+
+def decode_token(token: str, is_refresh=False):
+    """jwt.decode with a cache of verified payloads; raises JWTError."""
+    cache = refresh_token_cache if is_refresh else access_token_cache
+    key = hashlib.sha256(token.encode()).digest()
+
+    payload = cache.get(key)
+    if payload is None:
+        key_secret = (
+            settings.refresh_secret_key if is_refresh else settings.access_secret_key
+        )
+        payload = jwt.decode(token, key_secret, algorithms=[settings.algorithm])
+        exp = payload.get("exp")
+        if exp is not None:
+            cache.set(key, payload, expires_at=float(exp))
+
+    return dict(payload)
 
 
 def verify_token(token: str, is_refresh=False):
-    key = REFRESH_SECRET_KEY if is_refresh else ACCESS_SECRET_KEY
     try:
-        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
-        return payload
+        return decode_token(token, is_refresh=is_refresh)
     except JWTError:
         return None
@@ -0,0 +1,129 @@
+"""Working-set size and query latency before and after archiving.
+
+Point DATABASE_URL at an empty database and ARCHIVE_DIR at an empty
+directory, and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///archive.db ARCHIVE_DIR=bench-archive \
+        ACCESS_SECRET_KEY=bench uv run --extra parquet python -m benchmarks.archive
+
+The database is seeded with --years of expenses up to today. The script
+measures the database size and the latency of the usual reads, runs
+archive-expenses with --older-than-months and no purge delay, and measures
+again. The size is the whole database file on SQLite (after VACUUM) and the
+schema's data and index length on MySQL; the Parquet files are counted
+separately. The response cache is off.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+from datetime import timedelta
+
+PATHS = (
+    "/api/v1/all?limit=50",
+    "/api/v1/filter?limit=50&sort=-amount",
+    "/api/v1/dashboard?limit=50",
+    "/api/v1/analytics/report",
+    "/api/v1/search?q=coffee",
+)
+
+
+def database_bytes() -> int:
+    from sqlalchemy import text
+    from app.core.database import engine
+
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            connection.execute(text("VACUUM"))
+            return connection.scalar(
+                text(
+                    "SELECT page_count * page_size"
+                    " FROM pragma_page_count(), pragma_page_size()"
+                )
+            )
+        return connection.scalar(
+            text(
+                "SELECT SUM(data_length + index_length) FROM information_schema.tables"
+                " WHERE table_schema = DATABASE()"
+            )
+        )
+
+
+def archive_bytes(directory: str) -> int:
+    if not os.path.isdir(directory):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+
+def hot_rows() -> int:
+    from sqlalchemy import func, select
+    from app.core.database import engine
+    from app.models.expense import Expense
+
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(Expense))
+
+
+async def measure(args, label: str):
+    from app.core.archive import archive_catalog
+    from app.core.config import get_settings
+    from app.core.search import search_index
+    from benchmarks.common import client, run_load, summary
+
+    # Start cold, as the first reads after archive-expenses would
+    archive_catalog._loaded_at = None
+    search_index._users.clear()
+
+    print(f"== {label}")
+    print(
+        f"  database {database_bytes() / 2**20:9.1f} MiB"
+        f"  archive {archive_bytes(get_settings().archive_dir) / 2**20:9.1f} MiB"
+        f"  rows in expense {hot_rows()}"
+    )
+    clients = [client(user_id) for user_id in range(1, args.users + 1)]
+    for path in PATHS:
+        rng = random.Random(0)
+
+        async def send(i):
+            response = await rng.choice(clients).get(path)
+            response.raise_for_status()
+
+        elapsed, latencies = await run_load(send, args.requests, 1)
+        print(f"  {path:40s} {summary(elapsed, latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--older-than-months", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    os.environ["ARCHIVE_MANIFEST_TTL"] = "0"
+    from app.core.config import get_settings
+    from app.core.database import session_local
+    from app.utils import archive
+    from app.utils.clock import utcnow
+    from benchmarks.common import prepare, seed
+
+    prepare(parser)
+    days = args.years * 365
+    seed(args.users, args.per_user, utcnow() - timedelta(days=days), days)
+    asyncio.run(measure(args, "before"))
+
+    db = session_local()
+    try:
+        archived, _ = archive.archive_expenses(
+            db, get_settings().archive_dir, args.older_than_months, 0
+        )
+    finally:
+        db.close()
+    asyncio.run(measure(args, f"after archiving {len(archived)} months"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Requests per second with DB_ASYNC=true and DB_ASYNC=false.
+
+Point DATABASE_URL and ASYNC_DATABASE_URL at the same empty database and run
+from the server directory:
+
+    DATABASE_URL=sqlite:///engine.db \
+    ASYNC_DATABASE_URL=sqlite+aiosqlite:///engine.db \
+        uv run --with aiosqlite python -m benchmarks.async_engine
+
+The database is seeded once; each mode then runs in its own process, since
+the engines are chosen at import time, and fetches /all and /filter pages
+for random users at every --concurrency level. The response cache is off.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+
+PATHS = ("/api/v1/all?limit=100", "/api/v1/filter?limit=100&sort=-amount")
+
+
+async def measure(args):
+    from benchmarks.common import client, run_load, summary
+
+    rng = random.Random(0)
+    clients = [client(user_id) for user_id in range(1, args.users + 1)]
+
+    async def send(i):
+        response = await rng.choice(clients).get(PATHS[i % len(PATHS)])
+        response.raise_for_status()
+
+    for concurrency in args.concurrency:
+        await run_load(send, concurrency, concurrency)  # warm the pools
+        elapsed, latencies = await run_load(send, args.requests, concurrency)
+        print(f"  concurrency {concurrency:4d}: {summary(elapsed, latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--mode", choices=("sync", "async"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(measure(args))
+        return
+
+    os.environ["DB_ASYNC"] = "false"
+    from benchmarks.common import prepare, seed
+
+    prepare(parser)
+    seed(args.users, args.per_user)
+
+    for mode in ("sync", "async"):
+        print(f"== DB_ASYNC={'true' if mode == 'async' else 'false'}")
+        env = {
+            **os.environ,
+            "DB_ASYNC": "true" if mode == "async" else "false",
+            "RESPONSE_CACHE_SIZE": "0",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_engine", *sys.argv[1:]]
+            + ["--mode", mode],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Per-request cost of AuthMiddleware against the old BaseHTTPMiddleware.
+
+No table is touched, but importing the app needs a database URL; run from
+the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:// ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.auth_middleware
+
+"basehttp" is the jwt_middleware the app used to register with
+app.middleware("http"): the same checks, run through BaseHTTPMiddleware's
+call_next. Both wrap a bare Starlette app and are called directly over ASGI,
+once for a small JSON response and once for a response streamed in
+--chunks pieces, so the figures are the middleware's own overhead.
+"""
+
+import argparse
+import asyncio
+import time
+from jose import JWTError
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from app.core.auth import AuthMiddleware, unauthorized
+from app.utils.token import create_access_token, decode_token
+
+
+async def jwt_middleware(request, call_next):
+    token = request.cookies.get("accessToken")
+    if not token:
+        return unauthorized("__003")
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return unauthorized("__004")
+    if not payload:
+        return unauthorized("__007")
+    request.state.user = payload
+    return await call_next(request)
+
+
+def make_app(chunks: int) -> Starlette:
+    async def small(request):
+        return JSONResponse({"user": request.state.user["sub"]})
+
+    async def stream(request):
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 100 + b"\n"
+
+        return StreamingResponse(body())
+
+    return Starlette(routes=[Route("/small", small), Route("/stream", stream)])
+
+
+async def request(app, path: str, cookie: bytes) -> int:
+    """Runs one request; returns how many body messages reached the server."""
+    messages = 0
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # The client stays connected; anything listening is cancelled
+            # once the response is done
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal messages
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        else:
+            messages += 1
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"cookie", cookie)],
+        "server": ("testserver", 443),
+        "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+async def run(args):
+    cookie = f"accessToken={create_access_token({'sub': '1'})}".encode()
+    variants = {
+        "asgi": AuthMiddleware(make_app(args.chunks)),
+        "basehttp": BaseHTTPMiddleware(make_app(args.chunks), dispatch=jwt_middleware),
+    }
+    for path, repeat in (("/small", args.requests), ("/stream", args.streams)):
+        print(f"== {path}")
+        for label, app in variants.items():
+            messages = await request(app, path, cookie)  # warm up
+            began = time.perf_counter()
+            for _ in range(repeat):
+                await request(app, path, cookie)
+            spent = (time.perf_counter() - began) / repeat * 1e6
+            print(f"  {label:9s} {spent:9.1f} us/request  {messages:5d} body messages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--streams", type=int, default=500)
+    parser.add_argument("--chunks", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
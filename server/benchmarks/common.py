@@ -0,0 +1,126 @@
+"""Helpers shared by the benchmark scripts.
+
+The scripts seed the empty database in DATABASE_URL with synthetic users and
+expenses and drive the app in-process through httpx, so their figures leave
+out the network and the ASGI server.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+import httpx
+import numpy as np
+from sqlalchemy import insert, inspect
+from app.core.database import engine, session_local
+from app.core.migrations import run_migrations
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.user import User
+from app.utils import rollup
+from app.utils.token import create_access_token
+
+CATEGORIES = ("income", "food", "travel", "rent", "misc")
+WORDS = ("uber", "ride", "coffee", "grocery", "rent", "cinema", "lunch", "fuel")
+SEED_BATCH = 10000
+
+
+def prepare(parser):
+    """Migrates the database in DATABASE_URL to head; it has to be empty."""
+    if inspect(engine).has_table("expense"):
+        parser.error("DATABASE_URL must point at an empty database")
+    run_migrations()
+
+
+def seed(
+    users: int,
+    per_user: int,
+    start: datetime = datetime(2020, 1, 1),
+    days: int = 5 * 365,
+):
+    """Adds users 1..users, the categories and per_user random expenses each
+    spread over days from start, then builds the rollups."""
+    rng = random.Random(0)
+    minutes = days * 24 * 60
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {"name": f"u{i}", "email": f"u{i}@x.io", "password": "x"}
+                for i in range(1, users + 1)
+            ],
+        )
+        connection.execute(insert(Category), [{"name": name} for name in CATEGORIES])
+        batch = []
+        for user_id in range(1, users + 1):
+            for _ in range(per_user):
+                created_at = start + timedelta(minutes=rng.randrange(minutes))
+                batch.append(
+                    {
+                        "user_id": user_id,
+                        "category_id": rng.randint(1, len(CATEGORIES)),
+                        "amount": rng.randint(1, 5000),
+                        "description": " ".join(rng.sample(WORDS, 2)),
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    }
+                )
+                if len(batch) == SEED_BATCH:
+                    connection.execute(insert(Expense), batch)
+                    batch = []
+        if batch:
+            connection.execute(insert(Expense), batch)
+
+    db = session_local()
+    try:
+        rollup.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def client(user_id: int = None) -> httpx.AsyncClient:
+    """An httpx client calling the app in-process, logged in as user_id."""
+    from main import app
+
+    cookies = None
+    if user_id is not None:
+        cookies = {"accessToken": create_access_token({"sub": str(user_id)})}
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="https://testserver",
+        cookies=cookies,
+    )
+
+
+async def run_load(send, requests: int, concurrency: int):
+    """Awaits send(i) for i in range(requests), concurrency calls at a time.
+    Returns the elapsed seconds and the latency of every call."""
+    latencies = []
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            began = time.perf_counter()
+            await send(i)
+            latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - began, latencies
+
+
+def summary(elapsed: float, latencies: list) -> str:
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1000
+    return (
+        f"{len(latencies) / elapsed:9.1f} req/s  p50 {p50:7.2f} ms"
+        f"  p95 {p95:7.2f} ms  p99 {p99:7.2f} ms"
+    )
+
+
+def per_call_us(fn, repeat: int) -> float:
+    """Average microseconds per call of fn()."""
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - began) / repeat * 1e6
@@ -0,0 +1,81 @@
+"""Loading the dashboard: one /dashboard call against /all, /category_wise
+and /date_wise.
+
+Point DATABASE_URL at an empty database and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///dashboard.db ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.dashboard
+
+The database is seeded once. A "three calls" page sends the three requests at
+once, as the frontend did; a "dashboard" page sends one. Pages are loaded for
+random users, --concurrency at a time, with the response cache off. Next to
+the page latency the script prints the SQL statements and pool checkouts each
+page cost, read from the app's own counters; req/s there counts pages.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+
+PAGES = {
+    "three calls": (
+        "/api/v1/all?limit=20",
+        "/api/v1/category_wise",
+        "/api/v1/date_wise",
+    ),
+    "dashboard": ("/api/v1/dashboard?limit=20",),
+}
+
+
+def counters() -> tuple:
+    from app.core.instrumentation import db_queries_total
+    from app.services.internal import engine_pools
+
+    checkouts = sum(pool["checkouts"] for pool in engine_pools().values())
+    return db_queries_total.value, checkouts
+
+
+async def measure(args):
+    from benchmarks.common import client, run_load, summary
+
+    clients = [client(user_id) for user_id in range(1, args.users + 1)]
+
+    for label, paths in PAGES.items():
+        rng = random.Random(0)
+
+        async def send(i):
+            user = rng.choice(clients)
+            responses = await asyncio.gather(*(user.get(path) for path in paths))
+            for response in responses:
+                response.raise_for_status()
+
+        await run_load(send, args.concurrency, args.concurrency)  # warm up
+        queries, checkouts = counters()
+        elapsed, latencies = await run_load(send, args.pages, args.concurrency)
+        queries_after, checkouts_after = counters()
+        print(f"{label:12s} {summary(elapsed, latencies)}")
+        print(
+            f"{'':12s} {(queries_after - queries) / args.pages:9.1f} statements/page"
+            f"  {(checkouts_after - checkouts) / args.pages:5.1f} checkouts/page"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    from benchmarks.common import prepare, seed
+
+    prepare(parser)
+    seed(args.users, args.per_user)
+    asyncio.run(measure(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""POST /add_expense throughput with GROUP_COMMIT=true and GROUP_COMMIT=false.
+
+Point DATABASE_URL at an empty database and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///writes.db ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.group_commit
+
+Users and categories are seeded once; each mode then runs in its own
+process, since the writer is created at import time, and adds --requests
+expenses for random users at every --concurrency level. The write rate
+limits are raised out of the way. The figures are requests per second and
+latency; failed requests are counted rather than retried. On SQLite, which
+lets one writer in at a time, the ungrouped runs at higher concurrency end in
+"database is locked" errors; MySQL gives the figures that matter.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+
+
+async def measure(args):
+    from benchmarks.common import CATEGORIES, WORDS, client, run_load, summary
+
+    rng = random.Random(0)
+    clients = {user_id: client(user_id) for user_id in range(1, args.users + 1)}
+    failed = 0
+
+    async def send(i):
+        nonlocal failed
+        user_id = rng.randint(1, args.users)
+        try:
+            await add(user_id)
+        except Exception:
+            failed += 1
+
+    async def add(user_id):
+        response = await clients[user_id].post(
+            "/api/v1/add_expense",
+            json={
+                "user_id": user_id,
+                "category_id": rng.randint(1, len(CATEGORIES)),
+                "amount": rng.randint(1, 5000),
+                "description": " ".join(rng.sample(WORDS, 2)),
+            },
+        )
+        response.raise_for_status()
+
+    for concurrency in args.concurrency:
+        failed = 0
+        elapsed, latencies = await run_load(send, args.requests, concurrency)
+        print(
+            f"  concurrency {concurrency:4d}: {summary(elapsed, latencies)}"
+            f"  {failed} failed"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--mode", choices=("on", "off"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(measure(args))
+        return
+
+    from benchmarks.common import prepare, seed
+
+    prepare(parser)
+    seed(args.users, 0)
+
+    for mode in ("off", "on"):
+        print(f"== GROUP_COMMIT={'true' if mode == 'on' else 'false'}")
+        env = {
+            **os.environ,
+            "GROUP_COMMIT": "true" if mode == "on" else "false",
+            "RATE_LIMIT_WRITE_IP": "1000000/minute",
+            "RATE_LIMIT_WRITE_USER": "1000000/minute",
+            "MAX_IN_FLIGHT": str(max(args.concurrency) * 2),
+        }
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.group_commit", *sys.argv[1:]]
+            + ["--mode", mode],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
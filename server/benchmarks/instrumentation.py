@@ -0,0 +1,114 @@
+"""Overhead of MetricsMiddleware and the SQL timing hooks.
+
+Point DATABASE_URL at an empty database and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///metrics.db ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.instrumentation
+
+The database is seeded once. "instrumented" is the app as shipped; "bare" is
+the same app built without MetricsMiddleware and with the cursor-execute
+listeners taken off the engine. Both fetch the same /all and /filter pages
+one request at a time, alternating rounds so drift hits both alike. The
+response cache is off, so every request runs its queries.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+
+PATHS = ("/api/v1/all?limit=20", "/api/v1/filter?limit=20&sort=-amount")
+
+
+def clients(app, users: int) -> list:
+    import httpx
+    from app.utils.token import create_access_token
+
+    return [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="https://testserver",
+            cookies={"accessToken": create_access_token({"sub": str(user_id)})},
+        )
+        for user_id in range(1, users + 1)
+    ]
+
+
+def hooks(attach: bool):
+    from sqlalchemy import event
+    from app.core.database import engine
+    from app.core.instrumentation import (
+        _after_cursor_execute,
+        _before_cursor_execute,
+        instrument_engine,
+    )
+
+    if attach:
+        instrument_engine(engine)
+        return
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def measure(args):
+    from app.core.instrumentation import MetricsMiddleware
+    from benchmarks.common import run_load
+    from main import app, create_app
+
+    bare = create_app()
+    bare.user_middleware = [
+        middleware
+        for middleware in bare.user_middleware
+        if middleware.cls is not MetricsMiddleware
+    ]
+    variants = {
+        "instrumented": clients(app, args.users),
+        "bare": clients(bare, args.users),
+    }
+    latencies = {label: [] for label in variants}
+    elapsed = dict.fromkeys(variants, 0.0)
+    hooks(attach=False)
+
+    for round in range(args.rounds + 1):
+        for label, pool in variants.items():
+            rng = random.Random(round)
+
+            async def send(i):
+                response = await rng.choice(pool).get(PATHS[i % len(PATHS)])
+                response.raise_for_status()
+
+            if label == "instrumented":
+                hooks(attach=True)
+            spent, times = await run_load(send, args.requests, 1)
+            if label == "instrumented":
+                hooks(attach=False)
+            if round:  # the first round only warms both apps up
+                elapsed[label] += spent
+                latencies[label] += times
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    from benchmarks.common import prepare, seed, summary
+
+    prepare(parser)
+    seed(args.users, args.per_user)
+
+    elapsed, latencies = asyncio.run(measure(args))
+    for label in elapsed:
+        print(f"{label:12s} {summary(elapsed[label], latencies[label])}")
+    mean = {label: elapsed[label] / len(latencies[label]) for label in elapsed}
+    overhead = (mean["instrumented"] - mean["bare"]) * 1e6
+    print(f"overhead     {overhead:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Query plans for the expense access paths before and after revision 0002.
+
+Point DATABASE_URL at an empty database and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///plans.db \
+        uv run python -m benchmarks.query_plans
+
+The schema is upgraded to 0001 (no secondary indexes), seeded with synthetic
+expenses, and every query is explained and timed; then the schema is upgraded
+to 0002 and the same queries are explained and timed again.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, inspect, select, text
+from app.core.database import engine
+from app.core.migrations import run_migrations
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.user import User
+
+EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+def queries(user_id: int, income_id: int, start: datetime, end: datetime) -> dict:
+    return {
+        "/all page": select(Expense.id, Expense.amount, Expense.created_at)
+        .where(Expense.user_id == user_id, Expense.category_id != income_id)
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+        .limit(100),
+        "/filter date range": select(Expense.id, Expense.amount)
+        .where(
+            Expense.user_id == user_id,
+            Expense.created_at >= start,
+            Expense.created_at < end,
+        )
+        .order_by(Expense.created_at.desc(), Expense.id.desc()),
+        "/filter category + range": select(Expense.id, Expense.amount).where(
+            Expense.user_id == user_id,
+            Expense.category_id == income_id,
+            Expense.created_at >= start,
+            Expense.created_at < end,
+        ),
+        "category totals": select(Expense.category_id, func.sum(Expense.amount))
+        .where(Expense.user_id == user_id)
+        .group_by(Expense.category_id),
+        "login email lookup": select(User.id).where(User.email == f"u{user_id}@x.io"),
+        "category name check": select(Category.id).where(
+            func.lower(Category.name) == "income"
+        ),
+    }
+
+
+def seed(users: int, per_user: int):
+    start = datetime(2020, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {"name": f"u{i}", "email": f"u{i}@x.io", "password": "x"}
+                for i in range(1, users + 1)
+            ],
+        )
+        connection.execute(
+            insert(Category),
+            [{"name": name} for name in ("income", "food", "travel", "rent", "misc")],
+        )
+        rng = random.Random(0)
+        batch = []
+        for user_id in range(1, users + 1):
+            for _ in range(per_user):
+                batch.append(
+                    {
+                        "user_id": user_id,
+                        "category_id": rng.randint(1, 5),
+                        "amount": rng.randint(1, 5000),
+                        "description": "synthetic",
+                        "created_at": start
+                        + timedelta(minutes=rng.randint(0, 2_000_000)),
+                    }
+                )
+                if len(batch) == 10000:
+                    connection.execute(insert(Expense), batch)
+                    batch = []
+        if batch:
+            connection.execute(insert(Expense), batch)
+
+
+def report(label: str, statements: dict, repeat: int):
+    prefix = EXPLAIN.get(engine.dialect.name, "EXPLAIN ")
+    print(f"== {label}")
+    with engine.connect() as connection:
+        for name, statement in statements.items():
+            sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = connection.execute(text(prefix + sql)).all()
+            began = time.perf_counter()
+            for _ in range(repeat):
+                connection.execute(statement).all()
+            elapsed = (time.perf_counter() - began) / repeat * 1000
+            print(f"-- {name}: {elapsed:.2f} ms")
+            for row in plan:
+                print("   ", " | ".join(str(value) for value in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--per-user", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if inspect(engine).has_table("expense"):
+        parser.error("DATABASE_URL must point at an empty database")
+
+    run_migrations("0001")
+    seed(args.users, args.per_user)
+    statements = queries(args.users // 2, 1, datetime(2021, 3, 1), datetime(2021, 4, 1))
+    report("revision 0001", statements, args.repeat)
+
+    run_migrations("0002")
+    if engine.dialect.name in ("sqlite", "mysql"):
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "ANALYZE"
+                    if engine.dialect.name == "sqlite"
+                    else "ANALYZE TABLE expense"
+                )
+            )
+    report("revision 0002", statements, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
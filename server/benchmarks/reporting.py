@@ -0,0 +1,176 @@
+"""build_report against a row-by-row Python equivalent.
+
+No database is needed:
+
+    uv run python -m benchmarks.reporting --rows 1000000
+
+Both versions get the same synthetic year of expenses as parallel columns of
+Python objects and their reports are checked to agree. "loops" walks the
+rows once with dicts and then fills the daily and monthly axes in Python,
+the way the report would be written without numpy.
+"""
+
+import argparse
+import math
+import time
+from datetime import date, timedelta
+import numpy as np
+from app.utils.reporting import PERCENTILES, build_report
+
+NAMES = {1: "income", 2: "food", 3: "travel", 4: "rent", 5: "misc"}
+INCOME_IDS = {1}
+
+
+def make_columns(rows: int, start: date, end: date):
+    rng = np.random.default_rng(0)
+    span = (end - start).days
+    days = np.datetime64(start, "D") + rng.integers(0, span, rows)
+    category_ids = rng.integers(1, len(NAMES) + 1, rows)
+    amounts = rng.integers(1, 5000, rows).astype(np.float64)
+    return days, category_ids, amounts
+
+
+def _percentile(ordered: list, p: float) -> float:
+    # numpy's default linear interpolation
+    position = (len(ordered) - 1) * p / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _change(spend: float, previous):
+    if previous is None:
+        return None, None
+    delta = spend - previous
+    pct = round(delta / previous * 100, 2) if previous > 0 else None
+    return round(delta, 2), pct
+
+
+def loop_report(days, category_ids, amounts, start, end, income_ids, names, window):
+    daily_income, daily_spend, monthly_income, monthly_spend = {}, {}, {}, {}
+    totals, counts, spend_amounts = {}, {}, []
+    for day, category_id, amount in zip(days, category_ids, amounts):
+        month = day.replace(day=1)
+        if category_id in income_ids:
+            daily_income[day] = daily_income.get(day, 0.0) + amount
+            monthly_income[month] = monthly_income.get(month, 0.0) + amount
+        else:
+            daily_spend[day] = daily_spend.get(day, 0.0) + amount
+            monthly_spend[month] = monthly_spend.get(month, 0.0) + amount
+            spend_amounts.append(amount)
+        totals[category_id] = totals.get(category_id, 0.0) + amount
+        counts[category_id] = counts.get(category_id, 0) + 1
+
+    daily, balance, recent = [], 0.0, []
+    day = start
+    while day < end:
+        income, spend = daily_income.get(day, 0.0), daily_spend.get(day, 0.0)
+        balance += income - spend
+        recent = (recent + [spend])[-window:]
+        daily.append(
+            {
+                "date": day.isoformat(),
+                "income": income,
+                "spend": spend,
+                "balance": balance,
+                "spend_avg": round(sum(recent) / len(recent), 2),
+            }
+        )
+        day += timedelta(days=1)
+
+    monthly, previous = [], None
+    month = start.replace(day=1)
+    while month < end:
+        income, spend = monthly_income.get(month, 0.0), monthly_spend.get(month, 0.0)
+        delta, pct = _change(spend, previous)
+        monthly.append(
+            {
+                "month": month.isoformat(),
+                "income": income,
+                "spend": spend,
+                "net": income - spend,
+                "spend_delta": delta,
+                "spend_delta_pct": pct,
+            }
+        )
+        previous = spend
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    income_total = sum(daily_income.values())
+    spend_total = sum(daily_spend.values())
+    ordered = sorted(spend_amounts)
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "income": income_total,
+            "spend": spend_total,
+            "net": income_total - spend_total,
+            "count": len(amounts),
+        },
+        "percentiles": {
+            **{f"p{p}": _percentile(ordered, p) for p in PERCENTILES},
+            "mean": spend_total / len(ordered),
+            "max": ordered[-1],
+        },
+        "categories": [
+            {
+                "category_id": category_id,
+                "name": names.get(category_id),
+                "income": category_id in income_ids,
+                "total": totals[category_id],
+                "count": counts[category_id],
+                "share": (
+                    round(totals[category_id] / spend_total * 100, 2)
+                    if spend_total and category_id not in income_ids
+                    else None
+                ),
+            }
+            for category_id in sorted(totals, key=lambda key: (-totals[key], key))
+        ],
+        "monthly": monthly,
+        "daily": daily,
+    }
+
+
+def same(left, right) -> bool:
+    if isinstance(left, dict):
+        return left.keys() == right.keys() and all(
+            same(left[key], right[key]) for key in left
+        )
+    if isinstance(left, list):
+        return len(left) == len(right) and all(map(same, left, right))
+    if isinstance(left, float) and isinstance(right, float):
+        # Sums taken in another order, then rounded to cents
+        return math.isclose(left, right, rel_tol=1e-9, abs_tol=0.011)
+    return left == right
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--window", type=int, default=7)
+    args = parser.parse_args()
+
+    start, end = date(2024, 1, 1), date(2025, 1, 1)
+    days, category_ids, amounts = make_columns(args.rows, start, end)
+    # Both get Python objects, as the report endpoint does from its fetch, so
+    # build_report's figure includes turning them into arrays
+    columns = (days.astype(object).tolist(), category_ids.tolist(), amounts.tolist())
+
+    began = time.perf_counter()
+    vectorized = build_report(*columns, start, end, INCOME_IDS, NAMES, args.window)
+    vectorized_s = time.perf_counter() - began
+
+    began = time.perf_counter()
+    looped = loop_report(*columns, start, end, INCOME_IDS, NAMES, args.window)
+    looped_s = time.perf_counter() - began
+
+    assert same(vectorized, looped), "the two reports disagree"
+    print(f"build_report {vectorized_s * 1000:9.1f} ms")
+    print(f"loops        {looped_s * 1000:9.1f} ms")
+    print(f"speedup      {looped_s / vectorized_s:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Encoding a 10k-row /all response: Pydantic + stdlib json vs RowSerializer.
+
+No table is touched, but importing the app needs a database URL; run from
+the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:// ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.serialization
+
+"pydantic" is the path every handler used to take: a model per row,
+model_dump(mode="json") and a JSONResponse. "serializer" is the
+RowSerializer + orjson json_response path. Both bodies are checked to
+decode to the same document.
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from fastapi import status
+from fastapi.responses import JSONResponse
+from app.core.archive import ArchivedRow
+from app.schemas.expense import AllData
+from app.services.expense import all_serializer, with_category_name
+from app.utils.response import json_response
+
+NAMES = {1: "income", 2: "food", 3: "travel", 4: "rent", 5: "misc"}
+
+
+def make_rows(count: int) -> list:
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for id in range(count, 0, -1):
+        created_at = start + timedelta(minutes=rng.randrange(10**6))
+        rows.append(
+            ArchivedRow(
+                id=id,
+                amount=rng.randint(1, 5000),
+                description=f"expense {id}",
+                created_at=created_at,
+                updated_at=created_at,
+                category_id=rng.randint(1, 5),
+            )
+        )
+    return rows
+
+
+def pydantic_response(rows: list) -> bytes:
+    data = [
+        AllData.model_validate(with_category_name(row, NAMES)).model_dump(mode="json")
+        for row in rows
+    ]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": status.HTTP_200_OK, "message": "Ok", "data": data},
+    ).body
+
+
+def serializer_response(rows: list) -> bytes:
+    data = [all_serializer.row(with_category_name(row, NAMES)) for row in rows]
+    return json_response(data, message="Ok").body
+
+
+def time_ms(fn, rows: list, repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn(rows)
+    return (time.perf_counter() - began) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    slow, fast = pydantic_response(rows), serializer_response(rows)
+    assert json.loads(slow) == json.loads(fast), "the two paths disagree"
+
+    for label, fn, body in (
+        ("pydantic", pydantic_response, slow),
+        ("serializer", serializer_response, fast),
+    ):
+        elapsed = time_ms(fn, rows, args.repeat)
+        print(f"{label:10s} {elapsed:8.2f} ms/response  {len(body):9d} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Startup cost: importing the app and serving its first request.
+
+Point DATABASE_URL at an empty database and run from the server directory:
+
+    DB_ASYNC=false DATABASE_URL=sqlite:///startup.db ACCESS_SECRET_KEY=bench \
+        uv run python -m benchmarks.startup
+
+The database is seeded once. Every run is a fresh interpreter, so nothing is
+imported or warmed up yet: it times `import main`, then the first and second
+/all requests through benchmarks.common.client. The median and worst of
+--runs runs are printed, with the whole process's wall time next to them.
+"""
+
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+
+FIGURES = ("import main", "first request", "second request")
+
+
+def measure():
+    began = time.perf_counter()
+    importlib.import_module("main")
+
+    imported = time.perf_counter() - began
+
+    import asyncio
+    from benchmarks.common import client
+
+    async def requests() -> list:
+        timings = []
+        async with client(1) as user:
+            for _ in range(2):
+                began = time.perf_counter()
+                response = await user.get("/api/v1/all?limit=20")
+                response.raise_for_status()
+                timings.append(time.perf_counter() - began)
+        return timings
+
+    print(*(seconds * 1000 for seconds in [imported, *asyncio.run(requests())]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure()
+        return
+
+    # Not at the top: the measured processes must not have numpy loaded
+    # before `import main`
+    import numpy as np
+    from benchmarks.common import prepare, seed
+
+    prepare(parser)
+    seed(1, 1000)
+
+    runs, walls = [], []
+    for _ in range(args.runs):
+        began = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--measure"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        walls.append((time.perf_counter() - began) * 1000)
+        runs.append([float(value) for value in result.stdout.split()])
+
+    for label, values in zip(FIGURES + ("process",), [*zip(*runs), walls]):
+        print(
+            f"{label:15s} median {np.median(values):8.1f} ms"
+            f"  max {np.max(values):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
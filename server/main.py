@@ -1,78 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-import os
+from starlette.concurrency import run_in_threadpool
 from app.services.user import router
 from app.services.category import category_router
 from app.services.expense import expense_router
-from app.core.database import Base, engine
-from jose import jwt, JWTError
+from app.services.analytics import analytics_router
+from app.services.search import search_router
+from app.services.internal import (
+    internal_router,
+    metrics_router,
+    InternalAuthError,
+)
+from app.core.auth import AuthMiddleware
+from app.core.config import get_settings
+from app.core.database import dispose_engines
+from app.core.group_commit import group_commit_writer
+from app.core.instrumentation import MetricsMiddleware
+from app.core.replicas import replica_set
+from app.core.sessions import maintain_sessions
+from app.core.ratelimit import RateLimitMiddleware, ConcurrencyLimitMiddleware
+from app.core.migrations import run_migrations
+from app.core.store import shared_store
+from app.utils.password import shutdown_executor
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
-app = FastAPI()
-
-frontend_origin = os.getenv("CORS_ORIGIN").split(",")
-allowed_methods = os.getenv("CORS_METHODS").split(",")
-cors_header = os.getenv("CORS_HEADERS").split(",")
-ACCESS_SECRET_KEY = os.getenv("ACCESS_SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=frontend_origin,
-    allow_credentials=True,
-    allow_methods=allowed_methods,
-    allow_headers=cors_header,
-)
-
-
-@app.middleware("http")
-async def jwt_middleware(request: Request, call_next):
-    # Allow public routes if needed
-    PUBLIC_PATHS = ["/api/v1/login", "/api/v1/register"]
-
-    if request.method == "OPTIONS" or request.url.path in PUBLIC_PATHS:
-        return await call_next(request)
-
-    token = request.cookies.get("accessToken")
-
-    if not token:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={
-                "status": status.HTTP_401_UNAUTHORIZED,
-                "message": "HTTP_401_UNAUTHORIZED __003",
-            },
-            headers={
-                "Access-Control-Allow-Origin": "http://localhost:5173",
-                "Access-Control-Allow-Credentials": "true",
-            },
-        )
 
-    try:
-        payload = jwt.decode(token, ACCESS_SECRET_KEY, algorithms=[ALGORITHM])
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes normally run once per deploy via `python manage.py
+    # migrate`; AUTO_MIGRATE is for local development
+    if get_settings().auto_migrate:
+        await run_in_threadpool(run_migrations)
+    maintenance = asyncio.create_task(maintain_sessions())
+    yield
+    # Stop the sessions task before the engines and store it uses go away
+    maintenance.cancel()
+    with suppress(asyncio.CancelledError):
+        await maintenance
+    if group_commit_writer is not None:
+        await group_commit_writer.drain()
+    await dispose_engines()
+    await replica_set.dispose()
+    await shared_store.close()
+    await run_in_threadpool(shutdown_executor)
 
-        if not payload:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={
-                    "status": status.HTTP_401_UNAUTHORIZED,
-                    "message": "HTTP_401_UNAUTHORIZED __007",
-                },
-            )
-        request.state.user = payload
-    except JWTError:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={
-                "status": status.HTTP_401_UNAUTHORIZED,
-                "message": "HTTP_401_UNAUTHORIZED __004",
-            },
-        )
-    return await call_next(request)
 
-
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     error_detail = exc.errors()[0]
     message = error_detail.get("msg", "Validation error")
@@ -83,8 +58,44 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-Base.metadata.create_all(bind=engine)
+async def internal_auth_exception_handler(request: Request, exc: InternalAuthError):
+    return JSONResponse(
+        status_code=status.HTTP_403_FORBIDDEN,
+        content={"status": status.HTTP_403_FORBIDDEN, "message": "Forbidden"},
+    )
+
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+    app = FastAPI(lifespan=lifespan)
+
+    # Inside AuthMiddleware, so per-user buckets can see the token's claims
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(AuthMiddleware)
+    app.add_middleware(ConcurrencyLimitMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    # Outermost, so the 401/429/503 answers from the middlewares above carry
+    # the CORS headers too and the browser can read them
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=settings.cors_methods,
+        allow_headers=settings.cors_headers,
+        expose_headers=["Retry-After"],
+    )
+
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(InternalAuthError, internal_auth_exception_handler)
+
+    app.include_router(router, prefix="/api/v1", tags=["auth"])
+    app.include_router(category_router, prefix="/api/v1", tags=["category"])
+    app.include_router(expense_router, prefix="/api/v1", tags=["expense"])
+    app.include_router(search_router, prefix="/api/v1", tags=["search"])
+    app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["analytics"])
+    app.include_router(internal_router, prefix="/internal", tags=["internal"])
+    app.include_router(metrics_router, tags=["internal"])
+    return app
+
 
-app.include_router(router, prefix="/api/v1", tags=["auth"])
-app.include_router(category_router, prefix="/api/v1", tags=["category"])
-app.include_router(expense_router, prefix="/api/v1", tags=["expense"])
+app = create_app()
@@ -0,0 +1,70 @@
+import argparse
+from app.core.config import get_settings
+from app.core.database import session_local
+from app.core.migrations import run_migrations
+from app.models import category, user  # noqa: F401
+from app.utils import archive, rollup
+
+
+def rebuild_rollups(args):
+    db = session_local()
+    try:
+        rollup.rebuild(db, user_id=args.user_id, since=archive.hot_boundary(db))
+        db.commit()
+    finally:
+        db.close()
+
+
+def archive_expenses(args):
+    settings = get_settings()
+    db = session_local()
+    try:
+        archived, purged = archive.archive_expenses(
+            db,
+            settings.archive_dir,
+            args.older_than_months,
+            settings.archive_purge_delay_seconds,
+        )
+        for month in archived:
+            print(f"archived {month:%Y-%m}")
+        for month in purged:
+            print(f"purged {month:%Y-%m} from expense")
+    finally:
+        db.close()
+
+
+def migrate(args):
+    run_migrations(args.revision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget tracker management tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    upgrade = commands.add_parser(
+        "migrate", help="Upgrade the database schema to the given revision"
+    )
+    upgrade.add_argument("--revision", default="head")
+    upgrade.set_defaults(func=migrate)
+
+    rebuild = commands.add_parser(
+        "rebuild-rollups", help="Recompute the daily/category expense totals"
+    )
+    rebuild.add_argument("--user-id", type=int, default=None)
+    rebuild.set_defaults(func=rebuild_rollups)
+
+    archiver = commands.add_parser(
+        "archive-expenses",
+        help="Move old expense months to Parquet files and purge archived rows",
+    )
+    archiver.add_argument(
+        "--older-than-months", type=int, default=get_settings().archive_after_months
+    )
+    archiver.set_defaults(func=archive_expenses)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Existing databases created by Base.metadata.create_all already match this
+revision and only need `alembic stamp 0001`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(50), nullable=False),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("refresh_token", sa.Text(), nullable=True),
+        sa.Column("access_token", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+    op.create_index("ix_user_id", "user", ["id"])
+
+    op.create_table(
+        "category",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+    op.create_index("ix_category_id", "category", ["id"])
+
+    op.create_table(
+        "expense",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "category_id", sa.Integer(), sa.ForeignKey("category.id"), nullable=False
+        ),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+    op.create_index("ix_expense_id", "expense", ["id"])
+
+
+def downgrade():
+    op.drop_table("expense")
+    op.drop_table("category")
+    op.drop_table("user")
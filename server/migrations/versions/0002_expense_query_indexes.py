@@ -0,0 +1,38 @@
+"""expense query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+Covers the access paths used by expense_router (user_id filter, category
+join, created_at grouping/ranges), the email lookup in login/register and
+the case-insensitive name check in add_category.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_expense_user_created", "expense", ["user_id", "created_at"])
+    op.create_index(
+        "ix_expense_user_category_created",
+        "expense",
+        ["user_id", "category_id", "created_at"],
+    )
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+    op.create_index(
+        "ix_category_name_lower", "category", [sa.func.lower(sa.column("name"))]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_category_name_lower", table_name="category")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_index("ix_expense_user_category_created", table_name="expense")
+    op.drop_index("ix_expense_user_created", table_name="expense")
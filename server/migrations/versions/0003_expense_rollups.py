@@ -0,0 +1,47 @@
+"""expense rollup tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+Populate existing data with `python manage.py rebuild-rollups`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "expense_daily_total",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column(
+            "category_id",
+            sa.Integer(),
+            sa.ForeignKey("category.id"),
+            primary_key=True,
+        ),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "expense_category_total",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column(
+            "category_id",
+            sa.Integer(),
+            sa.ForeignKey("category.id"),
+            primary_key=True,
+        ),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("expense_category_total")
+    op.drop_table("expense_daily_total")
@@ -0,0 +1,31 @@
+"""expense description full-text index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+MySQL only; other databases are served by the in-process index in
+app.core.search.
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "mysql":
+        op.create_index(
+            "ix_expense_description_ft",
+            "expense",
+            ["description"],
+            mysql_prefix="FULLTEXT",
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "mysql":
+        op.drop_index("ix_expense_description_ft", table_name="expense")
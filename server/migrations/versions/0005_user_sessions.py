@@ -0,0 +1,39 @@
+"""refresh token sessions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+Refresh tokens issued before this revision carry no session id and are
+rejected by /refresh, so users log in once more.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_session",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("refresh_jti", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_user_session_user_id", "user_session", ["user_id"])
+    op.create_index("ix_user_session_revoked_at", "user_session", ["revoked_at"])
+    op.create_index("ix_user_session_expires_at", "user_session", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_user_session_expires_at", table_name="user_session")
+    op.drop_index("ix_user_session_revoked_at", table_name="user_session")
+    op.drop_index("ix_user_session_user_id", table_name="user_session")
+    op.drop_table("user_session")
@@ -0,0 +1,31 @@
+"""expense archive manifest
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00.000000
+
+Months are archived with `python manage.py archive-expenses`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "expense_archive",
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("path", sa.String(255), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.Column("purged_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("expense_archive")
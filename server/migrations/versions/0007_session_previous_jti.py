@@ -0,0 +1,28 @@
+"""refresh token reuse grace window
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:00:00.000000
+
+Keeps the jti replaced by the last rotation, so a concurrent /refresh with
+the same cookie is not mistaken for a replay.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("user_session", sa.Column("previous_jti", sa.String(32)))
+    op.add_column("user_session", sa.Column("rotated_at", sa.DateTime()))
+
+
+def downgrade():
+    with op.batch_alter_table("user_session") as batch_op:
+        batch_op.drop_column("rotated_at")
+        batch_op.drop_column("previous_jti")
@@ -0,0 +1,139 @@
+"""Test setup: the app runs on a throwaway SQLite database.
+
+The settings are read once at import time, so the environment is filled in
+here before anything from app/ is imported. Every test starts from empty
+tables and empty in-process caches.
+"""
+
+import os
+import shutil
+import tempfile
+
+TMP_DIR = tempfile.mkdtemp(prefix="budget-tracker-tests-")
+ARCHIVE_DIR = os.path.join(TMP_DIR, "archive")
+
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{TMP_DIR}/test.db",
+    DB_ASYNC="false",
+    ACCESS_SECRET_KEY="test-access-secret",
+    REFRESH_SECRET_KEY="test-refresh-secret",
+    CORS_ORIGIN="http://localhost:5173",
+    CORS_METHODS="*",
+    CORS_HEADERS="*",
+    ARCHIVE_DIR=ARCHIVE_DIR,
+    ARCHIVE_MANIFEST_TTL="0",
+    ARCHIVE_PURGE_DELAY_SECONDS="0",
+    ARGON2_TIME_COST="1",
+    ARGON2_MEMORY_COST="1024",
+    ARGON2_PARALLELISM="1",
+    RATE_LIMIT_LOGIN="1000/minute",
+    RATE_LIMIT_REGISTER="1000/minute",
+    RATE_LIMIT_WRITE_USER="1000/minute",
+    RATE_LIMIT_BULK_USER="1000/minute",
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+from main import app  # noqa: E402
+from app.core.archive import archive_catalog  # noqa: E402
+from app.core.category_cache import category_cache  # noqa: E402
+from app.core.database import Base, engine, session_local  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.core.response_cache import response_cache  # noqa: E402
+from app.core.search import search_index  # noqa: E402
+from app.core.sessions import revoked_sessions  # noqa: E402
+from app.core.store import shared_store  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.password import get_password_hash  # noqa: E402
+from app.utils.token import create_access_token  # noqa: E402
+
+PASSWORD = "password1"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    run_migrations()
+    yield
+    engine.dispose()
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+    shared_store._data.clear()
+    response_cache.local.clear()
+    category_cache.snapshot = None
+    archive_catalog._loaded_at = None
+    search_index._users.clear()
+    revoked_sessions._revoked.clear()
+    revoked_sessions.watermark = None
+    shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = session_local()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def categories(db):
+    """food, income and travel, by name -> id."""
+    rows = [Category(name=name) for name in ("food", "income", "travel")]
+    db.add_all(rows)
+    db.commit()
+    return {row.name: row.id for row in rows}
+
+
+@pytest.fixture
+def user(db):
+    row = User(
+        name="alice", email="alice@example.com", password=get_password_hash(PASSWORD)
+    )
+    db.add(row)
+    db.commit()
+    return row
+
+
+@pytest.fixture
+def client():
+    return TestClient(app, base_url="https://testserver")
+
+
+@pytest.fixture
+def auth_client(client, user):
+    """A client holding an access token for user."""
+    client.cookies.set("accessToken", create_access_token({"sub": str(user.id)}))
+    return client
+
+
+@pytest.fixture
+def add_expenses(db, user, categories):
+    """Inserts expenses for user: add_expenses([(created_at, amount), ...],
+    category="food"); returns their ids in the order given."""
+
+    def add(rows, category="food", user_id=None):
+        expenses = [
+            Expense(
+                user_id=user.id if user_id is None else user_id,
+                category_id=categories[category],
+                amount=amount,
+                description=f"expense {index}",
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            for index, (created_at, amount) in enumerate(rows)
+        ]
+        db.add_all(expenses)
+        db.commit()
+        return [expense.id for expense in expenses]
+
+    return add
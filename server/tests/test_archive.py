@@ -0,0 +1,145 @@
+from datetime import datetime, time, timedelta
+import pytest
+from sqlalchemy import func, select
+from app.core import archive as archive_module
+from app.models.expense import Expense
+from app.utils import rollup
+from app.utils.archive import archive_expenses, month_start
+from app.utils.clock import utcnow
+from conftest import ARCHIVE_DIR
+
+pytest.importorskip("pyarrow")
+
+PAGES = [
+    "/api/v1/all?limit=40",
+    "/api/v1/filter?limit=40",
+    "/api/v1/filter?limit=30&sort=amount",
+    "/api/v1/filter?limit=30&sort=-amount&min_amount=50",
+    "/api/v1/filter?limit=25&sort=created_at",
+]
+
+
+@pytest.fixture
+def history(db, user, categories, add_expenses):
+    """Three years of expenses for user and a second user, every 3 days."""
+    first_month = month_start(utcnow() - timedelta(days=3 * 365))
+    start = datetime.combine(first_month, time.min)
+    rows = [
+        (start + timedelta(days=day, hours=9), day * 7 % 97 + 1)
+        for day in range(0, 1095, 3)
+    ]
+    add_expenses(rows)
+    add_expenses(rows[::5], category="income")
+    add_expenses(rows, user_id=user.id + 1)
+    rollup.rebuild(db)
+    db.commit()
+    return start
+
+
+def walk(client, path: str) -> list:
+    rows, cursor = [], None
+    while True:
+        body = client.get(path + (f"&cursor={cursor}" if cursor else "")).json()
+        rows += body["data"]
+        cursor = body.get("next_cursor")
+        if not cursor:
+            return rows
+
+
+def responses(client, start) -> dict:
+    report_start = start + timedelta(days=40)
+    snapshot = {path: walk(client, path) for path in PAGES}
+    snapshot.update(
+        {
+            "totals": [client.get(path).json().get("total_amount") for path in PAGES],
+            "stream": client.get("/api/v1/filter?sort=-amount&stream=true").text,
+            "export": client.get("/api/v1/export").text,
+            "dashboard": client.get("/api/v1/dashboard?limit=5").json()["data"],
+            "report": client.get(
+                f"/api/v1/analytics/report?start={report_start:%Y-%m-%d}"
+            ).json()["data"],
+            "timeseries": client.get(
+                "/api/v1/analytics/timeseries?bucket=month&tz=America/New_York"
+                f"&start={start:%Y-%m-%d}&by_category=true"
+            ).json()["data"],
+            "search": client.get("/api/v1/search?q=expen&limit=100").json()["data"],
+        }
+    )
+    return snapshot
+
+
+def archive(db, purge_delay: float = 0):
+    archived, purged = archive_expenses(db, ARCHIVE_DIR, 12, purge_delay)
+    db.expire_all()
+    return archived, purged
+
+
+def test_archived_months_read_back_unchanged(auth_client, db, history):
+    before = responses(auth_client, history)
+
+    archived, purged = archive(db)
+
+    assert len(archived) >= 24 and purged == archived
+    hot = db.scalar(select(func.count()).select_from(Expense))
+    assert 0 < hot < 3 * 365
+    after = responses(auth_client, history)
+    for key in before:
+        assert after[key] == before[key], key
+
+
+def test_archived_months_are_not_counted_twice_before_purge(auth_client, db, history):
+    before = responses(auth_client, history)
+
+    archived, purged = archive(db, purge_delay=3600)
+
+    assert archived and not purged
+    assert responses(auth_client, history) == before
+
+
+def test_cursor_pages_read_only_the_months_they_need(
+    auth_client, db, history, monkeypatch
+):
+    archive(db)
+    reads = []
+    select_month = archive_module.select_month
+
+    def counting(path, *args):
+        reads.append(path)
+        return select_month(path, *args)
+
+    monkeypatch.setattr(archive_module, "select_month", counting)
+
+    body = auth_client.get("/api/v1/all?limit=500").json()
+    while body["next_cursor"]:
+        reads.clear()
+        body = auth_client.get(
+            f"/api/v1/all?limit=10&cursor={body['next_cursor']}"
+        ).json()
+        # Ten rows every three days span at most two months
+        assert len(reads) <= 2
+
+    reads.clear()
+    sdate = (history + timedelta(days=70)).strftime("%Y-%m-%d")
+    edate = (history + timedelta(days=80)).strftime("%Y-%m-%d")
+    auth_client.get(f"/api/v1/filter?sdate={sdate}&edate={edate}")
+    assert len(reads) == 1
+
+
+def test_import_into_archived_month_is_rejected(auth_client, db, history, categories):
+    archive(db)
+
+    response = auth_client.post(
+        "/api/v1/add_expense/bulk",
+        json=[
+            {
+                "category_id": categories["food"],
+                "amount": 5,
+                "description": "late receipt",
+                "created_at": history.isoformat(),
+            }
+        ],
+    )
+
+    assert response.json()["data"]["errors"] == [
+        {"row": 1, "message": "Date falls in an archived month"}
+    ]
@@ -0,0 +1,163 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.rollup import DailyTotal
+from app.utils.importers import iter_csv_rows, iter_ofx_rows, parse_ofx_datetime
+
+OFX = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260315093000.000[-5:EST]
+<TRNAMT>-42
+<NAME>Corner shop
+<MEMO>groceries
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260301
+<TRNAMT>1500.00
+<NAME>Payroll
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260302
+<TRNAMT>-3.50
+<NAME>Coffee
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>yesterday
+<TRNAMT>-7
+<NAME>Parking
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_parse_ofx_datetime():
+    assert parse_ofx_datetime("20260315") == datetime(2026, 3, 15)
+    assert parse_ofx_datetime("20260315093000.000[-5:EST]") == datetime(
+        2026, 3, 15, 14, 30
+    )
+    assert parse_ofx_datetime("20260315093000[+5.5:IST]") == datetime(2026, 3, 15, 4, 0)
+    assert parse_ofx_datetime("20261345") is None
+    assert parse_ofx_datetime("yesterday") is None
+
+
+def test_iter_ofx_rows():
+    rows = list(iter_ofx_rows(io.BytesIO(OFX)))
+
+    assert rows[0] == {
+        "amount": 42,
+        "description": "Corner shop groceries",
+        "created_at": datetime(2026, 3, 15, 14, 30),
+        "credit": False,
+    }
+    assert (rows[1]["amount"], rows[1]["credit"]) == (1500, True)
+    # Cents are passed on for validation to reject, not rounded
+    assert rows[2]["amount"] == Decimal("3.50")
+    assert rows[3]["created_at"] == "yesterday"
+
+
+def test_iter_csv_rows_strips_bom():
+    data = b"\xef\xbb\xbfcategory_id,amount,description\n1,20,lunch\n"
+
+    assert list(iter_csv_rows(io.BytesIO(data))) == [
+        {"category_id": "1", "amount": "20", "description": "lunch"}
+    ]
+
+
+def test_ofx_import(auth_client, categories, user, db):
+    response = auth_client.post(
+        "/api/v1/add_expense/bulk",
+        data={"category_id": str(categories["food"])},
+        files={"file": ("statement.ofx", OFX, "application/x-ofx")},
+    )
+
+    body = response.json()["data"]
+    assert (body["inserted"], body["failed"]) == (2, 2)
+    assert [error["row"] for error in body["errors"]] == [3, 4]
+    rows = db.execute(
+        select(Expense.category_id, Expense.amount, Expense.created_at).order_by(
+            Expense.id
+        )
+    ).all()
+    assert rows == [
+        (categories["food"], 42, datetime(2026, 3, 15, 14, 30)),
+        (categories["income"], 1500, datetime(2026, 3, 1)),
+    ]
+
+
+def test_csv_import_updates_rollups(auth_client, categories, db):
+    food = categories["food"]
+    data = (
+        "category_id,amount,description,created_at\n"
+        f"{food},20,lunch,2026-02-03T12:00:00\n"
+        f"{food},5,snack,2026-02-03T23:30:00-02:00\n"
+        f"{food},abc,broken,\n"
+        "999,1,unknown category,\n"
+    ).encode()
+
+    response = auth_client.post(
+        "/api/v1/add_expense/bulk",
+        files={"file": ("expenses.csv", data, "text/csv")},
+    )
+
+    body = response.json()["data"]
+    assert (body["inserted"], body["failed"]) == (2, 2)
+    assert body["errors"][1] == {"row": 4, "message": "Select a valid category"}
+    totals = db.execute(select(DailyTotal.day, DailyTotal.amount)).all()
+    # The offset row lands on the next UTC day
+    assert sorted(totals) == [(date(2026, 2, 3), 20), (date(2026, 2, 4), 5)]
+
+
+def test_json_import_rejects_non_array(auth_client, categories):
+    response = auth_client.post("/api/v1/add_expense/bulk", json={"amount": 1})
+
+    assert response.status_code == 400
+
+
+def test_import_sees_category_added_elsewhere(auth_client, categories, db):
+    # Load the snapshot, then add a category the way another worker would:
+    # without moving this worker's category version
+    auth_client.get("/api/v1/all")
+    rent = Category(name="rent")
+    db.add(rent)
+    db.commit()
+
+    response = auth_client.post(
+        "/api/v1/add_expense/bulk",
+        json=[{"category_id": rent.id, "amount": 900, "description": "March rent"}],
+    )
+    assert response.json()["data"]["inserted"] == 1
+
+    rows = auth_client.get("/api/v1/all").json()["data"]
+    assert [row["name"] for row in rows] == ["rent"]
+
+
+def test_credit_field_only_counts_in_ofx(auth_client, categories, db):
+    food = categories["food"]
+    data = (
+        "category_id,amount,description,credit\n"
+        f"{food},20,lunch out,false\n"
+        f"{food},30,dinner out,1\n"
+    ).encode()
+
+    auth_client.post(
+        "/api/v1/add_expense/bulk",
+        files={"file": ("expenses.csv", data, "text/csv")},
+    )
+    auth_client.post(
+        "/api/v1/add_expense/bulk",
+        json=[
+            {"category_id": food, "amount": 5, "description": "snack", "credit": True}
+        ],
+    )
+
+    assert db.scalars(select(Expense.category_id)).all() == [food] * 3
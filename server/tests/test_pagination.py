@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from app.utils.pagination import decode_cursor, encode_cursor
+
+START = datetime(2026, 1, 1, 12)
+
+
+def walk(client, path: str) -> list:
+    rows, cursor = [], None
+    while True:
+        url = path + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).json()
+        rows += body["data"]
+        cursor = body.get("next_cursor")
+        if not cursor:
+            return rows
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(START, 42)
+    assert decode_cursor(cursor) == (START, 42)
+    assert decode_cursor(encode_cursor(17, 3), int) == (17, 3)
+
+
+def test_decode_cursor_rejects_garbage():
+    assert decode_cursor("not a cursor") is None
+    assert decode_cursor(encode_cursor("abc", 1), int) is None
+
+
+def test_all_pages_cover_every_row_once(auth_client, add_expenses):
+    # Pairs of rows share a timestamp, so the id breaks ties across pages
+    ids = add_expenses([(START + timedelta(hours=i // 2), 10) for i in range(25)])
+
+    rows = walk(auth_client, "/api/v1/all?limit=4")
+
+    # Insertion order is (created_at, id) order, so newest first reverses it
+    assert [row["id"] for row in rows] == ids[::-1]
+
+
+def test_all_skips_income(auth_client, add_expenses):
+    add_expenses([(START, 10)], category="income")
+    spent = add_expenses([(START, 20)])
+
+    assert [row["id"] for row in walk(auth_client, "/api/v1/all?limit=10")] == spent
+
+
+def test_invalid_cursor_is_rejected(auth_client):
+    response = auth_client.get("/api/v1/all?cursor=bogus")
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid cursor"
+
+
+def test_filter_pages_by_amount_with_totals(auth_client, add_expenses):
+    amounts = [5, 1, 5, 3, 9, 1, 5]
+    add_expenses(
+        [(START + timedelta(days=i), amount) for i, amount in enumerate(amounts)]
+    )
+
+    first = auth_client.get("/api/v1/filter?sort=amount&limit=3").json()
+    rows = walk(auth_client, "/api/v1/filter?sort=amount&limit=3")
+
+    assert first["total"] == len(amounts)
+    assert first["total_amount"] == sum(amounts)
+    assert [row["amount"] for row in rows] == sorted(amounts)
+
+
+def test_stream_matches_pages(auth_client, add_expenses):
+    add_expenses([(START + timedelta(minutes=i), i + 1) for i in range(12)])
+
+    streamed = auth_client.get("/api/v1/all?stream=true").text.splitlines()
+
+    assert len(streamed) == 12
+    assert len(walk(auth_client, "/api/v1/all?limit=5")) == 12
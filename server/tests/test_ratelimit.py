@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core import ratelimit
+from app.core.ratelimit import LocalBuckets, RateLimit, SharedBuckets
+from app.core.store import shared_store
+
+LOGIN = ("POST", "/api/v1/login")
+ORIGIN = "http://localhost:5173"
+
+
+def take_all(buckets, count: int, limit: RateLimit) -> list:
+    async def take():
+        return [await buckets.take("key", limit) for _ in range(count)]
+
+    return asyncio.run(take())
+
+
+@pytest.mark.parametrize(
+    "buckets", [LocalBuckets(10), SharedBuckets(shared_store)], ids=["local", "shared"]
+)
+def test_buckets_allow_a_burst_then_wait(buckets):
+    waits = take_all(buckets, 4, RateLimit("3/minute"))
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0 < waits[3] <= 60
+
+
+def test_local_buckets_evict_old_keys():
+    buckets = LocalBuckets(2)
+    limit = RateLimit("1/hour")
+
+    async def take(key):
+        return await buckets.take(key, limit)
+
+    for key in ("a", "b", "c"):
+        asyncio.run(take(key))
+
+    # "a" was evicted, so it starts with a full bucket again
+    assert asyncio.run(take("a")) == 0.0
+    assert asyncio.run(take("c")) > 0
+
+
+def test_login_limit_answers_429_with_cors_headers(monkeypatch, user):
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, LOGIN, [("ip", RateLimit("2/minute"))])
+    client = TestClient(app, base_url="https://testserver", client=("10.0.0.1", 1))
+    body = {"email": user.email, "password": "wrong password"}
+
+    responses = [
+        client.post("/api/v1/login", json=body, headers={"Origin": ORIGIN})
+        for _ in range(3)
+    ]
+
+    assert [response.status_code for response in responses] == [401, 401, 429]
+    limited = responses[-1]
+    assert int(limited.headers["retry-after"]) >= 1
+    assert limited.headers["access-control-allow-origin"] == ORIGIN
+    assert "retry-after" in limited.headers["access-control-expose-headers"].lower()
+
+
+def test_limits_are_per_client_ip(monkeypatch, user):
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, LOGIN, [("ip", RateLimit("1/minute"))])
+    body = {"email": user.email, "password": "wrong password"}
+
+    for host in ("10.0.1.1", "10.0.1.2"):
+        client = TestClient(app, base_url="https://testserver", client=(host, 1))
+        assert client.post("/api/v1/login", json=body).status_code == 401
+
+
+def test_overload_is_shed_with_503(monkeypatch, auth_client):
+    monkeypatch.setattr(ratelimit.limiter_stats, "in_flight", 10**6)
+
+    response = auth_client.get("/api/v1/all")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,88 @@
+from datetime import timedelta
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core import sessions
+from app.core.config import get_settings
+from conftest import PASSWORD
+
+
+@pytest.fixture
+def logged_in(client, user):
+    response = client.post(
+        "/api/v1/login", json={"email": user.email, "password": PASSWORD}
+    )
+    assert response.status_code == 200
+    return client
+
+
+def with_refresh_token(token: str) -> TestClient:
+    other = TestClient(app, base_url="https://testserver")
+    other.cookies.set("refreshToken", token)
+    return other
+
+
+def cookie_max_ages(response) -> dict:
+    ages = {}
+    for header in response.headers.get_list("set-cookie"):
+        name = header.split("=", 1)[0]
+        for part in header.split(";"):
+            if part.strip().lower().startswith("max-age="):
+                ages[name] = int(part.split("=")[1])
+    return ages
+
+
+def test_cookies_expire_with_their_tokens(client, user):
+    settings = get_settings()
+    response = client.post(
+        "/api/v1/login", json={"email": user.email, "password": PASSWORD}
+    )
+
+    assert cookie_max_ages(response) == {
+        "accessToken": settings.access_token_expire_minutes * 60,
+        "refreshToken": settings.refresh_token_expire_days * 24 * 60 * 60,
+    }
+
+
+def test_refresh_rotates_the_token(logged_in):
+    old = logged_in.cookies.get("refreshToken")
+
+    response = logged_in.get("/api/v1/refresh")
+
+    assert response.status_code == 200
+    assert logged_in.cookies.get("refreshToken") != old
+    assert logged_in.get("/api/v1/all").status_code == 200
+
+
+def test_concurrent_refresh_within_grace_window(logged_in):
+    old = logged_in.cookies.get("refreshToken")
+    assert logged_in.get("/api/v1/refresh").status_code == 200
+
+    # A second tab still holding the old cookie
+    response = with_refresh_token(old).get("/api/v1/refresh")
+
+    assert response.status_code == 200
+    assert logged_in.get("/api/v1/refresh").status_code == 200
+
+
+def test_replay_after_grace_window_revokes_the_session(logged_in, monkeypatch):
+    monkeypatch.setattr(sessions, "REUSE_GRACE", timedelta(0))
+    old = logged_in.cookies.get("refreshToken")
+    assert logged_in.get("/api/v1/refresh").status_code == 200
+
+    response = with_refresh_token(old).get("/api/v1/refresh")
+
+    assert response.json()["message"] == "UNAUTHORIZED __002"
+    assert logged_in.get("/api/v1/refresh").status_code == 401
+    assert logged_in.get("/api/v1/all").json()["message"] == (
+        "HTTP_401_UNAUTHORIZED __008"
+    )
+
+
+def test_logout_revokes_the_access_token(logged_in):
+    access = logged_in.cookies.get("accessToken")
+
+    assert logged_in.post("/api/v1/logout").status_code == 200
+
+    logged_in.cookies.set("accessToken", access)
+    assert logged_in.get("/api/v1/all").status_code == 401